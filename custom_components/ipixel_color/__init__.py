@@ -8,13 +8,34 @@ import voluptuous as vol
 
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import Platform
-from homeassistant.core import HomeAssistant
-from homeassistant.exceptions import ConfigEntryNotReady
+from homeassistant.core import (
+    HomeAssistant,
+    ServiceCall,
+    ServiceResponse,
+    SupportsResponse,
+)
+from homeassistant.exceptions import ConfigEntryNotReady, HomeAssistantError
 from homeassistant.helpers import device_registry as dr
+from homeassistant.helpers import entity_registry as er
 import homeassistant.helpers.config_validation as cv
 
-from .const import DOMAIN, CONF_DEVICE_ADDRESS
+from .const import (
+    DOMAIN,
+    CONF_DEVICE_ADDRESS,
+    DATA_SCHEDULER,
+    DEFAULT_PROGRAM_SLOTS,
+    DISPLAY_MODE_ANIMATION,
+    DISPLAY_MODE_IMAGE,
+    DISPLAY_MODE_TEXT,
+    MAX_CONNECTIONS_PER_ADAPTER,
+    MAX_TRANSFERS_PER_ADAPTER,
+    TRANSFER_QUANTUM_CHUNKS,
+)
 from .coordinator import IPixelColorDataUpdateCoordinator
+from .layout import LayoutRegion
+from .playlist import PlaylistItem
+from .scheduler import IPixelColorScheduler
+from .slots import ProgramSlotTable
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -24,6 +45,119 @@ PLATFORMS: list[Platform] = [
     Platform.SENSOR,
 ]
 
+PLAYLIST_ITEM_SCHEMA = vol.Schema(
+    {
+        vol.Required("type"): vol.In(
+            [DISPLAY_MODE_TEXT, DISPLAY_MODE_IMAGE, DISPLAY_MODE_ANIMATION]
+        ),
+        vol.Required("content"): cv.string,
+        vol.Optional("dwell", default=10): vol.All(
+            vol.Coerce(float), vol.Range(min=1, max=3600)
+        ),
+        vol.Optional("color"): vol.All(
+            cv.ensure_list,
+            [vol.All(vol.Coerce(int), vol.Range(min=0, max=255))],
+        ),
+        vol.Optional("speed", default=1): vol.All(vol.Coerce(int), vol.Range(min=1, max=10)),
+    }
+)
+
+
+_COORD = vol.All(vol.Coerce(int), vol.Range(min=-128, max=255))
+_SIZE = vol.All(vol.Coerce(int), vol.Range(min=1, max=255))
+_COLOR = vol.All(
+    cv.ensure_list,
+    vol.Length(min=3, max=3),
+    [vol.All(vol.Coerce(int), vol.Range(min=0, max=255))],
+)
+
+
+LAYOUT_REGION_SCHEMA = vol.Schema(
+    {
+        vol.Required("name"): cv.string,
+        vol.Required("template"): cv.template,
+        vol.Optional("x", default=0): vol.All(vol.Coerce(int), vol.Range(min=0, max=127)),
+        vol.Optional("y", default=0): vol.All(vol.Coerce(int), vol.Range(min=0, max=127)),
+        vol.Required("width"): vol.All(vol.Coerce(int), vol.Range(min=1, max=128)),
+        vol.Required("height"): vol.All(vol.Coerce(int), vol.Range(min=1, max=128)),
+        vol.Optional("color"): _COLOR,
+    }
+)
+
+
+def _unique_region_names(regions: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    """Reject layouts that use a region name twice."""
+    names = [region["name"] for region in regions]
+    duplicates = sorted({name for name in names if names.count(name) > 1})
+    if duplicates:
+        raise vol.Invalid(f"Duplicate region names: {', '.join(duplicates)}")
+    return regions
+
+DRAW_OPERATION_SCHEMA = cv.key_value_schemas(
+    "op",
+    {
+        "clear": vol.Schema({vol.Required("op"): "clear"}),
+        "fill": vol.Schema({vol.Required("op"): "fill", vol.Required("color"): _COLOR}),
+        "pixel": vol.Schema(
+            {
+                vol.Required("op"): "pixel",
+                vol.Required("x"): _COORD,
+                vol.Required("y"): _COORD,
+                vol.Optional("color"): _COLOR,
+            }
+        ),
+        "line": vol.Schema(
+            {
+                vol.Required("op"): "line",
+                vol.Required("x"): _COORD,
+                vol.Required("y"): _COORD,
+                vol.Required("x2"): _COORD,
+                vol.Required("y2"): _COORD,
+                vol.Optional("color"): _COLOR,
+            }
+        ),
+        "rect": vol.Schema(
+            {
+                vol.Required("op"): "rect",
+                vol.Required("x"): _COORD,
+                vol.Required("y"): _COORD,
+                vol.Required("width"): _SIZE,
+                vol.Required("height"): _SIZE,
+                vol.Optional("color"): _COLOR,
+                vol.Optional("fill", default=False): cv.boolean,
+            }
+        ),
+        "blit": vol.Schema(
+            {
+                vol.Required("op"): "blit",
+                vol.Required("image_path"): cv.string,
+                vol.Optional("x", default=0): _COORD,
+                vol.Optional("y", default=0): _COORD,
+                vol.Inclusive("width", "size"): _SIZE,
+                vol.Inclusive("height", "size"): _SIZE,
+            }
+        ),
+    },
+)
+
+
+def _get_coordinator(
+    hass: HomeAssistant, entity_id: str
+) -> IPixelColorDataUpdateCoordinator | None:
+    """Return the coordinator of the panel owning entity_id.
+
+    Falls back to the first loaded panel when the entity is not registered.
+    """
+    coordinators = hass.data.get(DOMAIN, {})
+    entity_entry = er.async_get(hass).async_get(entity_id)
+    if entity_entry is not None and entity_entry.config_entry_id in coordinators:
+        return coordinators[entity_entry.config_entry_id]
+    for coord in coordinators.values():
+        if isinstance(coord, IPixelColorDataUpdateCoordinator):
+            return coord
+    return None
+
+
 async def async_setup(hass: HomeAssistant, config: dict) -> bool:
     """Set up the integration and register services."""
 
@@ -33,12 +167,7 @@ async def async_setup(hass: HomeAssistant, config: dict) -> bool:
         color = service_call.data.get("color", [255, 255, 255])
         speed = service_call.data.get("speed", 1)
 
-        coordinator = None
-        for coord in hass.data.get(DOMAIN, {}).values():
-            if hasattr(coord, "async_display_text"):
-                coordinator = coord
-                break
-
+        coordinator = _get_coordinator(hass, entity_id)
         if coordinator is None:
             _LOGGER.error("Coordinator not found to display text")
             return
@@ -49,12 +178,7 @@ async def async_setup(hass: HomeAssistant, config: dict) -> bool:
         entity_id = service_call.data["entity_id"]
         image_path = service_call.data["image_path"]
 
-        coordinator = None
-        for coord in hass.data.get(DOMAIN, {}).values():
-            if hasattr(coord, "async_display_image"):
-                coordinator = coord
-                break
-
+        coordinator = _get_coordinator(hass, entity_id)
         if coordinator is None:
             _LOGGER.error("Coordinator not found to display image")
             return
@@ -65,18 +189,132 @@ async def async_setup(hass: HomeAssistant, config: dict) -> bool:
         entity_id = service_call.data["entity_id"]
         animation = service_call.data["animation"]
 
-        coordinator = None
-        for coord in hass.data.get(DOMAIN, {}).values():
-            if hasattr(coord, "async_display_animation"):
-                coordinator = coord
-                break
-
+        coordinator = _get_coordinator(hass, entity_id)
         if coordinator is None:
             _LOGGER.error("Coordinator not found to display animation")
             return
 
         await coordinator.async_display_animation(animation)
 
+    async def handle_start_playlist(service_call: Any) -> None:
+        entity_id = service_call.data["entity_id"]
+        repeat = service_call.data["repeat"]
+        items = [
+            PlaylistItem(
+                content_type=item["type"],
+                content=item["content"],
+                dwell=item["dwell"],
+                color=item.get("color"),
+                speed=item["speed"],
+            )
+            for item in service_call.data["items"]
+        ]
+
+        coordinator = _get_coordinator(hass, entity_id)
+        if coordinator is None:
+            _LOGGER.error("Coordinator not found to start playlist")
+            return
+
+        await coordinator.async_start_playlist(items, repeat=repeat)
+
+    async def handle_stop_playlist(service_call: Any) -> None:
+        entity_id = service_call.data["entity_id"]
+
+        coordinator = _get_coordinator(hass, entity_id)
+        if coordinator is None:
+            _LOGGER.error("Coordinator not found to stop playlist")
+            return
+
+        await coordinator.async_stop_playlist()
+
+    async def handle_stream_entity(service_call: Any) -> None:
+        entity_id = service_call.data["entity_id"]
+        source_entity_id = service_call.data["source_entity_id"]
+        fps = service_call.data["fps"]
+
+        coordinator = _get_coordinator(hass, entity_id)
+        if coordinator is None:
+            _LOGGER.error("Coordinator not found to start stream")
+            return
+
+        await coordinator.async_start_stream(source_entity_id, fps)
+
+    async def handle_stop_stream(service_call: Any) -> None:
+        entity_id = service_call.data["entity_id"]
+
+        coordinator = _get_coordinator(hass, entity_id)
+        if coordinator is None:
+            _LOGGER.error("Coordinator not found to stop stream")
+            return
+
+        await coordinator.async_stop_stream()
+
+    async def handle_set_layout(service_call: Any) -> None:
+        entity_id = service_call.data["entity_id"]
+        min_interval = service_call.data["min_interval"]
+        regions = [
+            LayoutRegion(
+                name=region["name"],
+                template=region["template"],
+                x=region["x"],
+                y=region["y"],
+                width=region["width"],
+                height=region["height"],
+                color=tuple(region.get("color", [255, 255, 255])),
+            )
+            for region in service_call.data["regions"]
+        ]
+
+        coordinator = _get_coordinator(hass, entity_id)
+        if coordinator is None:
+            _LOGGER.error("Coordinator not found to set layout")
+            return
+
+        await coordinator.async_start_layout(regions, min_interval)
+
+    async def handle_clear_layout(service_call: Any) -> None:
+        entity_id = service_call.data["entity_id"]
+
+        coordinator = _get_coordinator(hass, entity_id)
+        if coordinator is None:
+            _LOGGER.error("Coordinator not found to clear layout")
+            return
+
+        coordinator.async_stop_layout()
+
+    async def handle_draw(service_call: Any) -> None:
+        entity_id = service_call.data["entity_id"]
+        operations = service_call.data["operations"]
+
+        coordinator = _get_coordinator(hass, entity_id)
+        if coordinator is None:
+            _LOGGER.error("Coordinator not found to draw")
+            return
+
+        await coordinator.async_draw(operations)
+
+    async def handle_clear_drawing(service_call: Any) -> None:
+        entity_id = service_call.data["entity_id"]
+
+        coordinator = _get_coordinator(hass, entity_id)
+        if coordinator is None:
+            _LOGGER.error("Coordinator not found to clear drawing")
+            return
+
+        coordinator.async_stop_drawing()
+
+    async def handle_profile(service_call: ServiceCall) -> ServiceResponse:
+        entity_id = service_call.data["entity_id"]
+        duration = service_call.data["duration"]
+
+        coordinator = _get_coordinator(hass, entity_id)
+        if coordinator is None:
+            raise HomeAssistantError(f"No iPixel Color display found for {entity_id}")
+
+        result = await coordinator.async_profile(duration)
+        hass.bus.async_fire(f"{DOMAIN}_profile", {"entity_id": entity_id, **result})
+        return result
+
     hass.services.async_register(
         DOMAIN,
         "display_text",
@@ -116,20 +354,149 @@ async def async_setup(hass: HomeAssistant, config: dict) -> bool:
         ),
     )
 
+    hass.services.async_register(
+        DOMAIN,
+        "stream_entity",
+        handle_stream_entity,
+        schema=vol.Schema(
+            {
+                vol.Required("entity_id"): cv.entity_id,
+                vol.Required("source_entity_id"): vol.All(
+                    cv.entity_id, cv.entity_domain(["camera", "image"])
+                ),
+                vol.Optional("fps", default=2): vol.All(
+                    vol.Coerce(float), vol.Range(min=0.1, max=10)
+                ),
+            }
+        ),
+    )
+    hass.services.async_register(
+        DOMAIN,
+        "stop_stream",
+        handle_stop_stream,
+        schema=vol.Schema(
+            {
+                vol.Required("entity_id"): cv.entity_id,
+            }
+        ),
+    )
+    hass.services.async_register(
+        DOMAIN,
+        "start_playlist",
+        handle_start_playlist,
+        schema=vol.Schema(
+            {
+                vol.Required("entity_id"): cv.entity_id,
+                vol.Required("items"): vol.All(
+                    cv.ensure_list, vol.Length(min=1), [PLAYLIST_ITEM_SCHEMA]
+                ),
+                vol.Optional("repeat", default=True): cv.boolean,
+            }
+        ),
+    )
+    hass.services.async_register(
+        DOMAIN,
+        "stop_playlist",
+        handle_stop_playlist,
+        schema=vol.Schema(
+            {
+                vol.Required("entity_id"): cv.entity_id,
+            }
+        ),
+    )
+
+    hass.services.async_register(
+        DOMAIN,
+        "set_layout",
+        handle_set_layout,
+        schema=vol.Schema(
+            {
+                vol.Required("entity_id"): cv.entity_id,
+                vol.Required("regions"): vol.All(
+                    cv.ensure_list,
+                    vol.Length(min=1),
+                    [LAYOUT_REGION_SCHEMA],
+                    _unique_region_names,
+                ),
+                vol.Optional("min_interval", default=1): vol.All(
+                    vol.Coerce(float), vol.Range(min=0.1, max=3600)
+                ),
+            }
+        ),
+    )
+    hass.services.async_register(
+        DOMAIN,
+        "clear_layout",
+        handle_clear_layout,
+        schema=vol.Schema(
+            {
+                vol.Required("entity_id"): cv.entity_id,
+            }
+        ),
+    )
+    hass.services.async_register(
+        DOMAIN,
+        "draw",
+        handle_draw,
+        schema=vol.Schema(
+            {
+                vol.Required("entity_id"): cv.entity_id,
+                vol.Required("operations"): vol.All(
+                    cv.ensure_list, vol.Length(min=1), [DRAW_OPERATION_SCHEMA]
+                ),
+            }
+        ),
+    )
+    hass.services.async_register(
+        DOMAIN,
+        "clear_drawing",
+        handle_clear_drawing,
+        schema=vol.Schema(
+            {
+                vol.Required("entity_id"): cv.entity_id,
+            }
+        ),
+    )
+    hass.services.async_register(
+        DOMAIN,
+        "profile",
+        handle_profile,
+        schema=vol.Schema(
+            {
+                vol.Required("entity_id"): cv.entity_id,
+                vol.Optional("duration", default=30): vol.All(
+                    vol.Coerce(float), vol.Range(min=1, max=600)
+                ),
+            }
+        ),
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+
     return True
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Set up iPixel Color from a config entry."""
     _LOGGER.debug("Setting up iPixel Color integration")
     
-    coordinator = IPixelColorDataUpdateCoordinator(hass, entry)
+    hass.data.setdefault(DOMAIN, {})
+    scheduler = hass.data[DOMAIN].get(DATA_SCHEDULER)
+    if scheduler is None:
+        scheduler = hass.data[DOMAIN][DATA_SCHEDULER] = IPixelColorScheduler(
+            hass,
+            MAX_CONNECTIONS_PER_ADAPTER,
+            MAX_TRANSFERS_PER_ADAPTER,
+            TRANSFER_QUANTUM_CHUNKS,
+        )
+
+    coordinator = IPixelColorDataUpdateCoordinator(hass, entry, scheduler=scheduler)
+    await coordinator.program_slots.async_load()
     
     try:
         await coordinator.async_config_entry_first_refresh()
     except Exception as err:
+        await coordinator.async_shutdown()
         raise ConfigEntryNotReady(f"Unable to connect to device: {err}") from err
     
-    hass.data.setdefault(DOMAIN, {})
     hass.data[DOMAIN][entry.entry_id] = coordinator
     
     device_registry = dr.async_get(hass)
@@ -158,6 +525,10 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     
     return unload_ok
 
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Drop the stored program slot table of a removed panel."""
+    await ProgramSlotTable(hass, entry.entry_id, DEFAULT_PROGRAM_SLOTS).async_remove()
+
 async def async_reload_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
     """Reload config entry."""
     await async_unload_entry(hass, entry)
@@ -19,7 +19,9 @@ from .const import (
     CONF_DEVICE_NAME,
     CONF_DISPLAY_WIDTH,
     CONF_DISPLAY_HEIGHT,
+    CONF_TEXT_MIN_INTERVAL,
     CONF_UPDATE_INTERVAL,
+    DEFAULT_TEXT_MIN_INTERVAL,
     DEFAULT_UPDATE_INTERVAL,
     DEFAULT_WIDTH,
     DEFAULT_HEIGHT,
@@ -177,6 +179,12 @@ class IPixelColorOptionsFlowHandler(config_entries.OptionsFlow):
                             CONF_UPDATE_INTERVAL, DEFAULT_UPDATE_INTERVAL
                         ),
                     ): vol.All(vol.Coerce(int), vol.Range(min=5, max=300)),
+                    vol.Optional(
+                        CONF_TEXT_MIN_INTERVAL,
+                        default=self.config_entry.options.get(
+                            CONF_TEXT_MIN_INTERVAL, DEFAULT_TEXT_MIN_INTERVAL
+                        ),
+                    ): vol.All(vol.Coerce(float), vol.Range(min=0, max=60)),
                 }
             ),
         )
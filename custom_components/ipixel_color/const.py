@@ -9,11 +9,28 @@ CONF_DEVICE_NAME: Final = "device_name"
 CONF_DISPLAY_WIDTH: Final = "display_width"
 CONF_DISPLAY_HEIGHT: Final = "display_height"
 CONF_UPDATE_INTERVAL: Final = "update_interval"
+CONF_TEXT_MIN_INTERVAL: Final = "text_min_interval"
 
 # Default values
 DEFAULT_UPDATE_INTERVAL: Final = 30
+DEFAULT_TEXT_MIN_INTERVAL: Final = 1.0
+
+# Adaptive health polling (seconds)
+MIN_POLL_INTERVAL: Final = 5
+MAX_POLL_INTERVAL: Final = 600
+IDLE_POLL_AFTER: Final = 600
 DEFAULT_WIDTH: Final = 32
 DEFAULT_HEIGHT: Final = 32
+DEFAULT_PROGRAM_SLOTS: Final = 8
+
+# Fleet scheduling (shared by all panels, per Bluetooth adapter)
+DATA_SCHEDULER: Final = "scheduler"
+MAX_CONNECTIONS_PER_ADAPTER: Final = 5
+MAX_TRANSFERS_PER_ADAPTER: Final = 1
+TRANSFER_QUANTUM_CHUNKS: Final = 16
+
+# Largest image file accepted for upload
+MAX_IMAGE_BYTES: Final = 1024 * 1024
 
 # BLE characteristics
 SERVICE_UUID: Final = "0000fff0-0000-1000-8000-00805f9b34fb"
@@ -4,26 +4,71 @@ from __future__ import annotations
 
 import asyncio
 import binascii
+import hashlib
 import logging
+import os
+from collections import Counter
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import Context, ContextVar
+from dataclasses import dataclass, field
 from datetime import timedelta
-from typing import Any, Optional
+from typing import Any, AsyncIterator, Awaitable, Callable, Iterator, Optional
 
 from bleak import BleakClient, BleakError
 from bleak.backends.characteristic import BleakGATTCharacteristic
 
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers.event import async_call_later
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
 
 from .const import (
     DOMAIN,
     CONF_DEVICE_ADDRESS,
+    CONF_DISPLAY_HEIGHT,
+    CONF_DISPLAY_WIDTH,
+    CONF_TEXT_MIN_INTERVAL,
     CONF_UPDATE_INTERVAL,
+    DEFAULT_TEXT_MIN_INTERVAL,
     DEFAULT_UPDATE_INTERVAL,
+    DEFAULT_HEIGHT,
+    DEFAULT_PROGRAM_SLOTS,
+    DEFAULT_WIDTH,
+    DISPLAY_MODE_DIY,
+    DISPLAY_MODE_IMAGE,
+    DISPLAY_MODE_TEXT,
+    IDLE_POLL_AFTER,
+    MAX_CONNECTIONS_PER_ADAPTER,
+    MAX_IMAGE_BYTES,
+    MAX_POLL_INTERVAL,
+    MAX_TRANSFERS_PER_ADAPTER,
+    MIN_POLL_INTERVAL,
+    TRANSFER_QUANTUM_CHUNKS,
 )
+from .framebuffer import IPixelColorFramebuffer
+from .layout import IPixelColorLayout, LayoutRegion
+from .playlist import IPixelColorPlaylist, PlaylistItem
+from .priority import PRIORITY_BULK, PRIORITY_CONTROL, PriorityLock
+from .profiling import (
+    STAGE_CRC,
+    STAGE_ENCODE,
+    STAGE_FILE_IO,
+    STAGE_GATT_WRITE,
+    STAGE_QUEUE_WAIT,
+    STAGE_SEND,
+    StageProfiler,
+)
+from .scheduler import IPixelColorScheduler, TransferTurn
+from .slots import ProgramSlotTable
+from .state import PanelState
+from .stream import IPixelColorFrameStream
 
 _LOGGER = logging.getLogger(__name__)
 
+# File reads are this many write chunks long
+FILE_BLOCK_CHUNKS = 4
+
 # Command IDs (példák; igazítsd az eszköz protokolljához)
 CMD_MAPPING = {
     "turn_on": 0x01,
@@ -32,81 +77,289 @@ CMD_MAPPING = {
     "display_text": 0x04,
     "display_image": 0x05,
     "display_animation": 0x06,
+    "store_program": 0x07,
+    "select_program": 0x08,
+    "set_brightness": 0x09,
+    "set_color": 0x0A,
+    "set_effect": 0x0B,
+    "display_frame": 0x0C,
+    "abort_transfer": 0x0D,
+    "draw_region": 0x0E,
 }
 
 
-def crc32( bytes) -> int:
-    """Calculate CRC32 checksum."""
-    return binascii.crc32(data) & 0xFFFFFFFF
+def crc32(data: bytes, value: int = 0) -> int:
+    """Calculate CRC32 checksum, optionally continuing from a previous value."""
+    return binascii.crc32(data, value) & 0xFFFFFFFF
+
+
+async def _iter_bytes(data: bytes) -> AsyncIterator[bytes]:
+    """Wrap an in-memory payload as a single-block stream."""
+    yield data
+
+
+@dataclass
+class _Batch:
+    """Frames and desired-state fields collected by async_batch."""
+
+    frames: list[bytearray] = field(default_factory=list)
+    fields: set[str] = field(default_factory=set)
 
 
 class IPixelColorDataUpdateCoordinator(DataUpdateCoordinator):
     """Manage BLE comms with iPixel Color LED matrix."""
 
-    def __init__(self, hass: HomeAssistant, entry: ConfigEntry) -> None:
-        """Initialize coordinator."""
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        entry: ConfigEntry,
+        client_factory: Callable[..., BleakClient] = BleakClient,
+        scheduler: Optional[IPixelColorScheduler] = None,
+    ) -> None:
+        """Initialize coordinator.
+
+        client_factory builds the BLE client; tests pass the emulator's.
+        scheduler is the fleet-wide one shared through hass.data; a private
+        one is used when none is given.
+        """
         self.entry = entry
+        self._client_factory = client_factory
+        self._scheduler = scheduler or IPixelColorScheduler(
+            hass,
+            MAX_CONNECTIONS_PER_ADAPTER,
+            MAX_TRANSFERS_PER_ADAPTER,
+            TRANSFER_QUANTUM_CHUNKS,
+        )
+        self.last_activity = 0.0
+        self._last_notify = 0.0
+        self._poll_failures = 0
+        self._connect_lock = asyncio.Lock()
+        # After a failed connect the panel may not evict others until it has
+        # advertised again (a newer advertisement than the one seen then).
+        self._connect_failed = False
+        self._seen_at_failure: Optional[float] = None
         self.device_address: str = entry.data[CONF_DEVICE_ADDRESS]
         self.client: Optional[BleakClient] = None
         self.write_characteristic: Optional[BleakGATTCharacteristic] = None
         self.notify_characteristics: list[BleakGATTCharacteristic] = []
 
-        self._is_on = False
-        self._brightness = 255
-        self._rgb_color = (255, 255, 255)
-        self._effect = "static"
-        self._display_mode = "off"
+        # What the user asked for, and what is known to be on the panel.
+        # They differ only after changes made while the panel was offline.
+        self.desired = PanelState()
+        self._applied = PanelState()
+        self._show_content: Optional[Callable[[], Awaitable[Any]]] = None
+        self._in_flight: Counter[str] = Counter()
+        self._deferred = False
+        self._reconcile_task: Optional[asyncio.Task] = None
+        self._playlist: Optional[IPixelColorPlaylist] = None
+        self._stream: Optional[IPixelColorFrameStream] = None
+        self._stream_fps = 0.0
+        self._layout: Optional[IPixelColorLayout] = None
+        self._framebuffer: Optional[IPixelColorFramebuffer] = None
+        self._last_text: Optional[tuple[str, tuple[int, ...], int]] = None
+        self._last_text_time = 0.0
+        self._pending_text: Optional[tuple[str, tuple[int, ...], int]] = None
+        self._text_timer: Optional[CALLBACK_TYPE] = None
+        self._text_min_interval: float = entry.options.get(
+            CONF_TEXT_MIN_INTERVAL, DEFAULT_TEXT_MIN_INTERVAL
+        )
+        self._max_chunk: Optional[int] = None
+        self._write_lock = PriorityLock()
+        self.profiler = StageProfiler()
+        self._bulk_lock = asyncio.Lock()
+        self._bulk_generation: dict[str, int] = {}
+        self._batch: ContextVar[Optional[_Batch]] = ContextVar(
+            f"ipixel_color_batch_{self.device_address}", default=None
+        )
+        self._background: ContextVar[bool] = ContextVar(
+            f"ipixel_color_background_{self.device_address}", default=False
+        )
+        self.program_slots = ProgramSlotTable(
+            hass, entry.entry_id, DEFAULT_PROGRAM_SLOTS
+        )
 
-        update_interval = timedelta(
-            seconds=entry.options.get(CONF_UPDATE_INTERVAL, DEFAULT_UPDATE_INTERVAL)
+        # Configured interval; the one in effect is adapted after every poll.
+        self._base_interval: float = entry.options.get(
+            CONF_UPDATE_INTERVAL, DEFAULT_UPDATE_INTERVAL
         )
 
         super().__init__(
             hass,
             _LOGGER,
             name=DOMAIN,
-            update_interval=update_interval,
+            update_interval=timedelta(seconds=self._base_interval),
         )
 
     async def _async_update_data(self) -> dict[str, Any]:
         """Fetch latest device state."""
+        if self.data is not None and not self.is_idle:
+            # A transfer is using the link; it proves the panel is reachable
+            # and a poll would only steal airtime from it. Commands sent
+            # meanwhile still have to reach the entities.
+            self._adapt_poll_interval(failed=False)
+            return {**self.data, **self._state_data()}
+
         try:
             if not self.client or not self.client.is_connected:
-                await self._async_connect()
+                # A health check is not worth disconnecting another panel.
+                if not await self._async_connect(evict=False):
+                    # All slots are busy: health unknown, but not a failure.
+                    self._adapt_poll_interval(failed=False)
+                    return {
+                        **self._state_data(),
+                        "connection_status": "unknown",
+                        "firmware_version": (self.data or {}).get(
+                            "firmware_version", "Unknown"
+                        ),
+                    }
 
             device_info = await self._async_get_device_info()
+            self._adapt_poll_interval(failed=False)
 
             return {
-                "is_on": self._is_on,
-                "brightness": self._brightness,
-                "rgb_color": self._rgb_color,
-                "effect": self._effect,
-                "display_mode": self._display_mode,
+                **self._state_data(),
                 "connection_status": "connected",
                 "firmware_version": device_info.get("firmware_version", "Unknown"),
             }
         except Exception as err:
-            _LOGGER.error("Failed updating  %s", err)
-            raise UpdateFailed(f"Failed updating  {err}") from err
+            self._adapt_poll_interval(failed=True)
+            _LOGGER.error("Failed updating data: %s", err)
+            raise UpdateFailed(f"Failed updating data: {err}") from err
 
-    async def _async_connect(self) -> None:
-        """Connect BLE and prepare characteristics/notifications."""
-        if self.client and self.client.is_connected:
-            return
+    def _state_data(self) -> dict[str, Any]:
+        """Return the coordinator data describing the panel's state."""
+        return {
+            "is_on": self.desired.is_on,
+            "brightness": self.desired.brightness,
+            "rgb_color": self.desired.rgb_color,
+            "effect": self.desired.effect,
+            "display_mode": self.desired.display_mode,
+            "stream_fps": self._stream_fps,
+        }
+
+    @property
+    def _poll_interval(self) -> float:
+        """Return the poll interval in effect, in seconds."""
+        return self.update_interval.total_seconds()
+
+    def _adapt_poll_interval(self, failed: bool) -> None:
+        """Pick the next poll interval from recent errors and activity.
+
+        After failures the panel is probed more often so a recovery is seen
+        quickly. A panel that is idle, or whose notifications show the link
+        is alive anyway, is polled less.
+        """
+        base = self._base_interval
+        if failed:
+            self._poll_failures += 1
+            seconds = base / 2 ** min(self._poll_failures, 3)
+        else:
+            self._poll_failures = 0
+            now = self.hass.loop.time()
+            factor = 1
+            if now - self._last_notify < base:
+                factor = 2
+            if now - self.last_activity > IDLE_POLL_AFTER:
+                factor = 4
+            seconds = base * factor
+        seconds = min(MAX_POLL_INTERVAL, max(MIN_POLL_INTERVAL, seconds))
+        if seconds != self._poll_interval:
+            _LOGGER.debug("Polling %s every %ss", self.device_address, seconds)
+            self.update_interval = timedelta(seconds=seconds)
+
+    async def _async_connect(self, evict: bool = True) -> bool:
+        """Connect BLE and prepare characteristics/notifications.
+
+        Returns False, without connecting, if evict is False and the adapter
+        has no free connection slot. Background sends and panels that could
+        not be reached last time never evict.
+        """
+        async with self._connect_lock:
+            if self.client and self.client.is_connected:
+                return True
+
+            evict = evict and not self._background.get() and self._may_evict()
+            # Wait for a connection slot on the adapter serving this panel.
+            if not await self._scheduler.async_acquire_connection(self, evict):
+                return False
+            try:
+                self.client = self._client_factory(
+                    self.device_address, disconnected_callback=self._on_disconnected
+                )
+                self._max_chunk = None
+                await self.client.connect()
+                self._connect_failed = False
+                _LOGGER.info("Connected to BLE device %s", self.device_address)
+
+                # Service/char discovery
+                await self._discover_characteristics()
+
+                # Enable notifications if any notify char is present
+                await self._enable_notifications()
+
+                if self._deferred:
+                    self._deferred = False
+                    # A fresh context: the caller may be inside async_batch,
+                    # whose frames were already flushed or never will be.
+                    self._reconcile_task = Context().run(
+                        self.hass.async_create_task, self._async_reconcile()
+                    )
+                return True
+
+            except BleakError as err:
+                self._scheduler.release_connection(self)
+                self._connect_failed = True
+                self._seen_at_failure = self._scheduler.last_seen(self.device_address)
+                _LOGGER.error("Connection failed: %s", err)
+                raise UpdateFailed(f"Connection failed: {err}") from err
+            except Exception:
+                self._scheduler.release_connection(self)
+                raise
+
+    def _may_evict(self) -> bool:
+        """Return False while the panel has not been seen since a failed connect."""
+        if not self._connect_failed:
+            return True
+        seen = self._scheduler.last_seen(self.device_address)
+        return seen is not None and seen != self._seen_at_failure
+
+    @contextmanager
+    def background(self) -> Iterator[None]:
+        """Mark sends made inside the block as background work.
+
+        Streams, retries, playlist uploads and reconnect restores use this:
+        they connect only if a slot is free and never disconnect another
+        panel to get one.
+        """
+        token = self._background.set(True)
         try:
-            self.client = BleakClient(self.device_address)
-            await self.client.connect()
-            _LOGGER.info("Connected to BLE device %s", self.device_address)
+            yield
+        finally:
+            self._background.reset(token)
 
-            # Service/char discovery
-            await self._discover_characteristics()
+    @callback
+    def _on_disconnected(self, client: BleakClient) -> None:
+        """Free the adapter connection slot when the link drops."""
+        if client is self.client:
+            _LOGGER.debug("Disconnected from %s", self.device_address)
+            self._scheduler.release_connection(self)
 
-            # Enable notifications if any notify char is present
-            await self._enable_notifications()
+    @property
+    def is_idle(self) -> bool:
+        """Return True if no transfer is running or queued."""
+        return not self._bulk_lock.locked() and not self._write_lock.locked()
 
-        except BleakError as err:
-            _LOGGER.error("Connection failed: %s", err)
-            raise UpdateFailed(f"Connection failed: {err}") from err
+    async def async_release_connection(self) -> None:
+        """Disconnect so another panel on the same adapter can connect."""
+        if self.client and self.client.is_connected:
+            # Stop notifications
+            for ch in self.notify_characteristics:
+                try:
+                    await self.client.stop_notify(ch)
+                except Exception:
+                    pass
+            await self.client.disconnect()
+        self._scheduler.release_connection(self)
 
     async def _discover_characteristics(self) -> None:
         """Discover writable and notifiable characteristics."""
@@ -142,7 +395,8 @@ class IPixelColorDataUpdateCoordinator(DataUpdateCoordinator):
         if not self.client or not self.client.is_connected:
             return
 
-        async def _notify_cb(sender: BleakGATTCharacteristic,  bytearray) -> None:
+        async def _notify_cb(sender: BleakGATTCharacteristic, data: bytearray) -> None:
+            self._last_notify = self.hass.loop.time()
             _LOGGER.debug("Notify from %s: %s", sender.uuid, data.hex())
 
         for ch in self.notify_characteristics:
@@ -167,59 +421,610 @@ class IPixelColorDataUpdateCoordinator(DataUpdateCoordinator):
         rgb_color: Optional[tuple[int, int, int]] = None,
         effect: Optional[str] = None,
     ) -> None:
-        self._is_on = True
+        changes: dict[str, Any] = {"is_on": True}
         if brightness is not None:
-            self._brightness = brightness
+            changes["brightness"] = brightness
         if rgb_color is not None:
-            self._rgb_color = rgb_color
+            changes["rgb_color"] = tuple(rgb_color)
         if effect is not None:
-            self._effect = effect
+            changes["effect"] = effect
+        await self._async_change(**changes)
 
-        await self._send_command("turn_on")
-        await self.async_request_refresh()
+        # Inside a batch the frames are not sent yet; the caller refreshes.
+        if self._batch.get() is None:
+            await self.async_request_refresh()
 
     async def async_turn_off(self) -> None:
-        self._is_on = False
-        await self._send_command("turn_off")
+        await self._async_change(is_on=False)
         await self.async_request_refresh()
 
     async def async_set_display_mode(self, mode: str) -> None:
-        self._display_mode = mode
-        await self._send_command("set_mode", {"mode": mode})
+        if mode != DISPLAY_MODE_DIY:
+            self.async_stop_drawing()
+        self._forget_text()
+        await self._async_change(display_mode=mode)
         await self.async_request_refresh()
 
     async def async_display_text(
         self, text: str, color: Optional[list[int]] = None, speed: int = 1
     ) -> None:
-        color = color or [255, 255, 255]
-        text_bytes = text.encode("utf-8")
+        """Show text, dropping repeats and rate-limiting changes.
 
-        payload = bytearray()
-        payload.append(CMD_MAPPING["display_text"])
-        payload.append(max(0, min(speed, 10)))  # clamp speed 0..10
-        payload.extend(color[:3])  # RGB
-        payload.append(len(text_bytes))
-        payload.extend(text_bytes)
+        A request identical to what is on screen is dropped. Changes arriving
+        within the minimum interval of the last render are held back and
+        only the latest one is sent once the interval is over.
+        """
+        await self._async_stop_sources()
+        request = (
+            text,
+            tuple((color or [255, 255, 255])[:3]),
+            max(0, min(speed, 10)),
+        )
 
-        checksum = crc32(payload)
-        payload.extend(checksum.to_bytes(4, "little"))
+        if request == self._last_text:
+            # Also covers a value bouncing back before a held one went out.
+            self._cancel_pending_text()
+            _LOGGER.debug("Dropping duplicate text %r", text)
+            return
 
-        await self._send_raw(payload)
+        wait = self._last_text_time + self._text_min_interval - self.hass.loop.time()
+        if wait > 0:
+            self._pending_text = request
+            if self._text_timer is None:
+                self._text_timer = async_call_later(
+                    self.hass, wait, self._async_flush_pending_text
+                )
+            return
+
+        await self._async_render_text(request)
+
+    async def _async_flush_pending_text(self, _now: Any) -> None:
+        """Send the latest text held back by the rate limit."""
+        self._text_timer = None
+        request, self._pending_text = self._pending_text, None
+        if request is not None and request != self._last_text:
+            await self._async_render_text(request)
+
+    async def _async_render_text(
+        self, request: tuple[str, tuple[int, ...], int]
+    ) -> None:
+        text, color, speed = request
+        # Set up front so repeats arriving during the upload are dropped.
+        self._last_text = request
+        self._last_text_time = self.hass.loop.time()
+        payload = self._build_text_payload(text, list(color), speed)
+        shown = False
+        try:
+            shown = await self._async_show_content(
+                hashlib.sha1(payload).hexdigest(),
+                lambda: self._async_show_program(payload),
+            )
+        finally:
+            if not shown and self._last_text == request:
+                # Never selected on the panel; let the next identical
+                # request through.
+                self._last_text = None
+
+    def _cancel_pending_text(self) -> None:
+        if self._text_timer is not None:
+            self._text_timer()
+            self._text_timer = None
+        self._pending_text = None
+
+    def _forget_text(self) -> None:
+        """Other content replaced the text; the next text must be sent."""
+        self._cancel_pending_text()
+        self._last_text = None
+        # Until new content says otherwise there is nothing to replay.
+        self.desired.content_hash = self._applied.content_hash = None
+        self._show_content = None
 
     async def async_display_image(self, image_path: str) -> None:
-        with open(image_path, "rb") as f:
-            image_data = f.read()
+        await self._async_stop_sources()
+        # A missing or oversize file must not replace what is shown.
+        await self._async_stat_image(image_path)
+        self._forget_text()
 
-        payload = bytearray()
-        payload.append(CMD_MAPPING["display_image"])
-        payload.extend(image_data)
+        async def show() -> bool:
+            slot = await self._async_store_image(image_path)
+            if slot is None:
+                return False
+            await self._send_command("select_program", {"slot": slot})
+            return True
 
-        checksum = crc32(payload)
+        await self._async_show_content(
+            hashlib.sha1(f"image:{image_path}".encode()).hexdigest(), show
+        )
+
+    async def async_display_animation(self, animation_name: str) -> None:
+        await self._async_stop_sources()
+        self._forget_text()
+        payload = self._build_animation_payload(animation_name)
+        await self._async_show_content(
+            hashlib.sha1(payload).hexdigest(), lambda: self._send_raw(payload)
+        )
+
+    async def _async_stop_sources(self) -> None:
+        """Stop whatever keeps replacing the content by itself."""
+        await self.async_stop_playlist()
+        await self.async_stop_stream()
+        self.async_stop_layout()
+        self.async_stop_drawing()
+
+    # Playlist
+
+    async def async_start_playlist(
+        self, items: list[PlaylistItem], repeat: bool = True
+    ) -> None:
+        """Replace the running playlist (if any) and start the new one."""
+        await self.async_stop_playlist()
+        await self.async_stop_stream()
+        self.async_stop_layout()
+        self.async_stop_drawing()
+        self._playlist = IPixelColorPlaylist(self, items, repeat=repeat)
+        self._playlist.start()
+
+    async def async_stop_playlist(self) -> None:
+        """Stop the running playlist, leaving the current item on screen."""
+        if self._playlist is not None:
+            await self._playlist.async_stop()
+            self._playlist = None
+
+    async def async_prepare_content(self, item: PlaylistItem) -> Any:
+        """Get a playlist item ready so showing it is a single short command.
+
+        Text and images are uploaded into a program slot and the slot number
+        is returned; animations are returned as their (tiny) frame.
+        """
+        if item.content_type == DISPLAY_MODE_TEXT:
+            payload = self._build_text_payload(item.content, item.color, item.speed)
+            return await self._async_store_program(payload, channel="preload")
+        if item.content_type == DISPLAY_MODE_IMAGE:
+            return await self._async_store_image(item.content, channel="preload")
+        return self._build_animation_payload(item.content)
+
+    async def async_show_prepared(self, prepared: Any) -> None:
+        """Show content previously returned by async_prepare_content."""
+        if prepared is None:
+            return
+        self._forget_text()
+        if isinstance(prepared, int):
+            await self._send_command("select_program", {"slot": prepared})
+        else:
+            await self._send_raw(prepared)
+
+    # Live frame stream
+
+    async def async_start_stream(self, source_entity_id: str, fps: float) -> None:
+        """Mirror a camera/image entity on the panel, replacing any playlist."""
+        await self.async_stop_stream()
+        await self.async_stop_playlist()
+        self.async_stop_layout()
+        self.async_stop_drawing()
+        self._stream = IPixelColorFrameStream(
+            self,
+            source_entity_id,
+            fps,
+            self.entry.data.get(CONF_DISPLAY_WIDTH, DEFAULT_WIDTH),
+            self.entry.data.get(CONF_DISPLAY_HEIGHT, DEFAULT_HEIGHT),
+        )
+        self._stream.start()
+
+    async def async_stop_stream(self) -> None:
+        """Stop the live frame stream, if any."""
+        if self._stream is not None:
+            await self._stream.async_stop()
+            self._stream = None
+            self.async_report_stream_fps(0.0)
+
+    @callback
+    def async_report_stream_fps(self, fps: float) -> None:
+        """Publish the frame rate the stream actually achieves."""
+        self._stream_fps = fps
+        if self.data is not None:
+            self.data["stream_fps"] = fps
+            self.async_update_listeners()
+
+    async def async_send_frame(
+        self, frame: bytes, width: int, height: int, channel: str = "display"
+    ) -> bool:
+        """Send one raw RGB888 frame; False if a newer transfer replaced it."""
+        self._forget_text()
+        with self.profiler.span(STAGE_ENCODE):
+            payload = bytearray([CMD_MAPPING["display_frame"], width, height])
+            payload.extend(frame)
+        with self.profiler.span(STAGE_CRC):
+            checksum = crc32(payload)
         payload.extend(checksum.to_bytes(4, "little"))
+        return await self._send_raw(payload, channel=channel)
 
-        await self._send_raw(payload)
+    # Layouts
 
-    async def async_display_animation(self, animation_name: str) -> None:
+    async def async_start_layout(
+        self, regions: list[LayoutRegion], min_interval: float
+    ) -> None:
+        """Show a template-driven layout, replacing any playlist or stream."""
+        width = self.entry.data.get(CONF_DISPLAY_WIDTH, DEFAULT_WIDTH)
+        height = self.entry.data.get(CONF_DISPLAY_HEIGHT, DEFAULT_HEIGHT)
+        for region in regions:
+            if region.x + region.width > width or region.y + region.height > height:
+                raise HomeAssistantError(
+                    f"Region {region.name} does not fit the {width}x{height} display"
+                )
+        self.async_stop_layout()
+        await self.async_stop_playlist()
+        await self.async_stop_stream()
+        self.async_stop_drawing()
+        self._layout = IPixelColorLayout(self, regions, min_interval)
+        self._layout.async_start()
+
+    @callback
+    def async_stop_layout(self) -> None:
+        """Stop updating the current layout, if any."""
+        if self._layout is not None:
+            self._layout.async_stop()
+            self._layout = None
+
+    async def async_send_region(
+        self, name: str, x: int, y: int, width: int, height: int, pixels: bytes
+    ) -> bool:
+        """Draw an RGB888 bitmap at (x, y); False if a newer draw replaced it."""
+        self._forget_text()
+        with self.profiler.span(STAGE_ENCODE):
+            payload = bytearray([CMD_MAPPING["draw_region"], x, y, width, height])
+            payload.extend(pixels)
+        with self.profiler.span(STAGE_CRC):
+            checksum = crc32(payload)
+        payload.extend(checksum.to_bytes(4, "little"))
+        # Each region has its own channel: a redraw supersedes only itself.
+        return await self._send_raw(payload, channel=f"region:{name}")
+
+    # DIY drawing
+
+    async def async_draw(self, operations: list[dict[str, Any]]) -> None:
+        """Draw on the framebuffer; changes reach the panel once per tick.
+
+        The first draw switches the panel to DIY mode and stops any
+        playlist, stream or layout that would paint over it.
+        """
+        framebuffer = self._framebuffer
+        if framebuffer is None:
+            # Created before awaiting anything, so overlapping first draws
+            # share one framebuffer.
+            framebuffer = self._framebuffer = IPixelColorFramebuffer(
+                self,
+                self.entry.data.get(CONF_DISPLAY_WIDTH, DEFAULT_WIDTH),
+                self.entry.data.get(CONF_DISPLAY_HEIGHT, DEFAULT_HEIGHT),
+            )
+            await self.async_stop_playlist()
+            await self.async_stop_stream()
+            self.async_stop_layout()
+            await self.async_set_display_mode(DISPLAY_MODE_DIY)
+        await framebuffer.async_apply(operations)
+
+    @callback
+    def async_stop_drawing(self) -> None:
+        """Drop the framebuffer and any flush still scheduled for it."""
+        if self._framebuffer is not None:
+            self._framebuffer.async_cancel()
+            self._framebuffer = None
+
+    # Profiling
+
+    async def async_profile(self, duration: float) -> dict[str, Any]:
+        """Capture per-stage timings for duration seconds and return them."""
+        if self.profiler.active:
+            raise HomeAssistantError("A profile capture is already running")
+        self.profiler.start()
+        try:
+            await asyncio.sleep(duration)
+        finally:
+            stages = self.profiler.stop()
+        return {
+            "device_address": self.device_address,
+            "duration": duration,
+            "stages": stages,
+        }
+
+    # Desired state
+
+    async def _async_change(self, **changes: Any) -> None:
+        """Make changes part of the desired state and send them to the panel."""
+        for name, value in changes.items():
+            setattr(self.desired, name, value)
+        names = set(changes)
+
+        batch = self._batch.get()
+        if batch is not None:
+            batch.frames.extend(self._build_state_frames(names))
+            batch.fields |= names
+            return
+
+        await self._async_deliver(
+            names, lambda: self._send_frames(self._build_state_frames(names))
+        )
+
+    async def _async_show_content(
+        self, content_hash: str, show: Callable[[], Awaitable[Any]]
+    ) -> bool:
+        """Make content the desired content and show it.
+
+        Returns False if a newer upload superseded it before it was shown.
+        If show fails while the panel is reachable, the previous desired
+        content is put back, so the failure is not replayed on reconnect.
+        """
+        previous = self.desired.content_hash, self._show_content
+        self.desired.content_hash = content_hash
+        self._show_content = show
+        try:
+            return await self._async_deliver({"content_hash"}, show)
+        except Exception:
+            if self._show_content is show:
+                self.desired.content_hash, self._show_content = previous
+            raise
+
+    async def _async_deliver(
+        self, names: set[str], send: Callable[[], Awaitable[Any]]
+    ) -> bool:
+        """Run send and record the desired fields names as applied.
+
+        If the panel is offline the change stays in the desired state and is
+        sent by _async_reconcile once the panel is back. Returns False, and
+        records nothing, if send reports that it was superseded.
+        """
+        values = {name: getattr(self.desired, name) for name in names}
+        self._in_flight.update(names)
+        try:
+            if await send() is False:
+                return False
+        except (UpdateFailed, asyncio.TimeoutError) as err:
+            if not names or (self.client is not None and self.client.is_connected):
+                raise
+            self._deferred = True
+            _LOGGER.info(
+                "%s is offline (%s); %s will be restored on reconnect",
+                self.device_address, err, ", ".join(sorted(names)),
+            )
+            return True
+        finally:
+            self._in_flight.subtract(names)
+        for name, value in values.items():
+            setattr(self._applied, name, value)
+        return True
+
+    def _build_state_frames(self, names: set[str]) -> list[bytearray]:
+        """Build the frames that set the given fields to their desired value."""
+        desired = self.desired
+        commands: list[tuple[str, Optional[dict[str, Any]]]] = []
+        if "is_on" in names:
+            commands.append(("turn_on" if desired.is_on else "turn_off", None))
+        if "display_mode" in names:
+            commands.append(("set_mode", {"mode": desired.display_mode}))
+        if "brightness" in names:
+            commands.append(("set_brightness", {"brightness": desired.brightness}))
+        if "rgb_color" in names:
+            commands.append(("set_color", {"rgb_color": desired.rgb_color}))
+        if "effect" in names:
+            commands.append(("set_effect", {"effect": desired.effect}))
+        return [
+            frame
+            for command, params in commands
+            if (frame := self._build_command_frame(command, params)) is not None
+        ]
+
+    @callback
+    def async_redraw_on_reconnect(self) -> None:
+        """Redraw the layout or drawing once the panel is reachable again."""
+        self._deferred = True
+
+    async def _async_reconcile(self) -> None:
+        """Send what changed while the panel was offline, as few frames as possible.
+
+        Only fields whose desired value differs from what the panel last
+        received are sent; settings go out as one batch, followed by the
+        content if it changed. Fields a command is sending right now are
+        left to that command. A layout or drawing is redrawn, as updates
+        to it may have been lost.
+        """
+        if self._layout is not None:
+            self._layout.async_redraw()
+        if self._framebuffer is not None:
+            self._framebuffer.async_redraw()
+
+        names = {
+            name
+            for name in self.desired.diff(self._applied)
+            if not self._in_flight[name]
+        }
+        if not names:
+            return
+        _LOGGER.info(
+            "Restoring %s on %s", ", ".join(sorted(names)), self.device_address
+        )
+        try:
+            with self.background():
+                if settings := names - {"content_hash"}:
+                    await self._async_deliver(
+                        settings,
+                        lambda: self._send_frames(self._build_state_frames(settings)),
+                    )
+                if "content_hash" in names and self._show_content is not None:
+                    await self._async_deliver({"content_hash"}, self._show_content)
+        except Exception as err:
+            _LOGGER.warning("Restoring state on %s failed: %s", self.device_address, err)
+
+    # Program slots
+
+    async def _async_show_program(self, payload: bytearray) -> bool:
+        """Show a content frame, uploading it only if no slot holds it yet.
+
+        Returns False if a newer upload superseded it before it was selected.
+        """
+        slot = await self._async_store_program(payload)
+        if slot is None:
+            return False
+        await self._send_command("select_program", {"slot": slot})
+        return True
+
+    async def _async_store_program(
+        self, payload: bytearray, channel: str = "display"
+    ) -> Optional[int]:
+        """Make sure payload is stored on the device and return its slot.
+
+        Returns None if a newer upload on the same channel superseded this one.
+        """
+        content_hash = hashlib.sha1(payload).hexdigest()
+
+        def program_frame(slot: int) -> AsyncIterator[bytes]:
+            with self.profiler.span(STAGE_ENCODE):
+                frame = bytearray([CMD_MAPPING["store_program"], slot])
+                frame.extend(payload)
+            with self.profiler.span(STAGE_CRC):
+                checksum = crc32(frame)
+            frame.extend(checksum.to_bytes(4, "little"))
+            return _iter_bytes(frame)
+
+        return await self._async_store_blocks(content_hash, program_frame, channel)
+
+    async def _async_store_image(
+        self, image_path: str, channel: str = "display"
+    ) -> Optional[int]:
+        """Stream an image file into a program slot and return the slot.
+
+        The file is never held in memory as a whole: it is read in blocks that
+        go straight to the radio while the CRCs are computed on the fly.
+        Oversize files are rejected before anything is read or sent.
+        """
+        stat = await self._async_stat_image(image_path)
+
+        # Identify the file by path, size and mtime so known images are found
+        # without reading them.
+        content_hash = hashlib.sha1(
+            f"{image_path}:{stat.st_size}:{stat.st_mtime_ns}".encode()
+        ).hexdigest()
+
+        return await self._async_store_blocks(
+            content_hash,
+            lambda slot: self._async_iter_image_frame(image_path, slot),
+            channel,
+        )
+
+    async def _async_stat_image(self, image_path: str) -> os.stat_result:
+        """Return the file's stat, rejecting files too large to upload."""
+        try:
+            stat = await self.hass.async_add_executor_job(os.stat, image_path)
+        except OSError as err:
+            raise HomeAssistantError(f"Image {image_path} not readable: {err}") from err
+        if stat.st_size > MAX_IMAGE_BYTES:
+            raise HomeAssistantError(
+                f"Image {image_path} is {stat.st_size} bytes, "
+                f"the limit is {MAX_IMAGE_BYTES} bytes"
+            )
+        return stat
+
+    async def _async_store_blocks(
+        self,
+        content_hash: str,
+        make_frame: Callable[[int], AsyncIterator[bytes]],
+        channel: str,
+    ) -> Optional[int]:
+        slot = self.program_slots.lookup(content_hash)
+        if slot is not None:
+            _LOGGER.debug("Content %s already in slot %d", content_hash, slot)
+            return slot
+
+        reserved = False
+
+        async def frame_blocks() -> AsyncIterator[bytes]:
+            # Runs once the bulk lock is held: the upload just before this
+            # one may have stored the same content.
+            nonlocal slot, reserved
+            slot = self.program_slots.lookup(content_hash)
+            if slot is not None:
+                return
+            slot = self.program_slots.allocate()
+            reserved = True
+            blocks = make_frame(slot)
+            try:
+                async for block in blocks:
+                    yield block
+            finally:
+                await blocks.aclose()
+
+        try:
+            sent = await self._send_stream(frame_blocks(), channel)
+        except BaseException:
+            if reserved:
+                self.program_slots.rollback(slot)
+            raise
+        if not reserved:
+            return slot if sent else None
+        if not sent:
+            self.program_slots.rollback(slot)
+            return None
+        self.program_slots.commit(content_hash, slot)
+        return slot
+
+    async def _async_iter_image_frame(
+        self, image_path: str, slot: int
+    ) -> AsyncIterator[bytes]:
+        """Yield a store_program frame wrapping a display_image payload.
+
+        Layout: store_program, slot, display_image, <file>, inner crc, outer crc.
+        """
+        header = bytes([CMD_MAPPING["store_program"], slot])
+        inner_header = bytes([CMD_MAPPING["display_image"]])
+        inner_crc = crc32(inner_header)
+        outer_crc = crc32(inner_header, crc32(header))
+        yield header + inner_header
+
+        async for block in self._async_read_file(image_path):
+            with self.profiler.span(STAGE_CRC):
+                inner_crc = crc32(block, inner_crc)
+                outer_crc = crc32(block, outer_crc)
+            yield block
+
+        inner_trailer = inner_crc.to_bytes(4, "little")
+        outer_crc = crc32(inner_trailer, outer_crc)
+        yield inner_trailer + outer_crc.to_bytes(4, "little")
+
+    async def _async_read_file(self, path: str) -> AsyncIterator[bytes]:
+        """Read a file in blocks without blocking the event loop."""
+        block_size = FILE_BLOCK_CHUNKS * (self._max_chunk or 20)
+        f = await self.hass.async_add_executor_job(open, path, "rb")
+        try:
+            while True:
+                with self.profiler.span(STAGE_FILE_IO):
+                    block = await self.hass.async_add_executor_job(f.read, block_size)
+                if not block:
+                    return
+                yield block
+        finally:
+            await self.hass.async_add_executor_job(f.close)
+
+    # Payload builders
+
+    def _build_text_payload(
+        self, text: str, color: Optional[list[int]] = None, speed: int = 1
+    ) -> bytearray:
+        with self.profiler.span(STAGE_ENCODE):
+            color = color or [255, 255, 255]
+            text_bytes = text.encode("utf-8")
+
+            payload = bytearray()
+            payload.append(CMD_MAPPING["display_text"])
+            payload.append(max(0, min(speed, 10)))  # clamp speed 0..10
+            payload.extend(color[:3])  # RGB
+            payload.append(len(text_bytes))
+            payload.extend(text_bytes)
+
+        with self.profiler.span(STAGE_CRC):
+            checksum = crc32(payload)
+        payload.extend(checksum.to_bytes(4, "little"))
+        return payload
+
+    @staticmethod
+    def _build_animation_payload(animation_name: str) -> bytearray:
         anim_bytes = animation_name.encode("utf-8")
 
         payload = bytearray()
@@ -229,18 +1034,31 @@ class IPixelColorDataUpdateCoordinator(DataUpdateCoordinator):
 
         checksum = crc32(payload)
         payload.extend(checksum.to_bytes(4, "little"))
-
-        await self._send_raw(payload)
+        return payload
 
     # Low-level send utilities
 
     async def _send_command(
         self, command: str, params: Optional[dict[str, Any]] = None
     ) -> None:
+        payload = self._build_command_frame(command, params)
+        if payload is None:
+            return
+
+        batch = self._batch.get()
+        if batch is not None:
+            batch.frames.append(payload)
+            return
+
+        await self._send_raw(payload)
+
+    def _build_command_frame(
+        self, command: str, params: Optional[dict[str, Any]] = None
+    ) -> Optional[bytearray]:
         cmd_id = CMD_MAPPING.get(command)
         if cmd_id is None:
             _LOGGER.error("Unknown command: %s", command)
-            return
+            return None
 
         payload = bytearray([cmd_id])
 
@@ -248,16 +1066,174 @@ class IPixelColorDataUpdateCoordinator(DataUpdateCoordinator):
             mode_bytes = params.get("mode", "").encode("utf-8")
             payload.append(len(mode_bytes))
             payload.extend(mode_bytes)
+        elif params and command == "select_program":
+            payload.append(params["slot"])
+        elif params and command == "set_brightness":
+            payload.append(max(0, min(params["brightness"], 255)))
+        elif params and command == "set_color":
+            payload.extend(params["rgb_color"][:3])
+        elif params and command == "set_effect":
+            effect_bytes = params.get("effect", "").encode("utf-8")
+            payload.append(len(effect_bytes))
+            payload.extend(effect_bytes)
 
         checksum = crc32(payload)
         payload.extend(checksum.to_bytes(4, "little"))
+        return payload
 
-        await self._send_raw(payload)
+    @asynccontextmanager
+    async def async_batch(self) -> AsyncIterator[None]:
+        """Collect the commands sent inside the block and flush them together.
+
+        Frames are packed back to back into as few MTU-sized writes as
+        possible (usually one), instead of one write per command. Nested
+        blocks join the outermost one. Nothing is sent if the block raises.
+        """
+        if self._batch.get() is not None:
+            yield
+            return
+
+        batch = _Batch()
+        token = self._batch.set(batch)
+        try:
+            yield
+        finally:
+            self._batch.reset(token)
+
+        if batch.frames:
+            await self._async_deliver(
+                batch.fields, lambda: self._send_frames(batch.frames)
+            )
+
+    async def _send_frames(self, frames: list[bytearray]) -> None:
+        """Send several complete frames packed into as few writes as possible.
+
+        The packed writes go out back to back at control priority.
+        """
+        use_response, max_chunk = await self._async_prepare_write()
+
+        writes: list[bytearray] = []
+        current = bytearray()
+        for frame in frames:
+            if current and len(current) + len(frame) > max_chunk:
+                writes.append(current)
+                current = bytearray()
+            current.extend(frame)
+        writes.append(current)
+
+        _LOGGER.debug(
+            "Batch of %d frames packed into %d writes", len(frames), len(writes)
+        )
+        with self.profiler.span(STAGE_SEND):
+            async with self._async_hold_write_lock(PRIORITY_CONTROL):
+                for data in writes:
+                    await self._async_write_chunks(data, use_response, max_chunk)
+
+    async def _send_raw(
+        self, payload: bytearray, channel: Optional[str] = None
+    ) -> bool:
+        """Chunked write with notify enabled and max-size detection.
+
+        Without a channel the payload is a control frame: it is written in
+        one go and may cut in between the chunks of a running bulk transfer.
+        With a channel it is a bulk transfer; a newer bulk transfer on the
+        same channel cancels it between chunks. Returns False if superseded.
+        """
+        if channel is None:
+            with self.profiler.span(STAGE_SEND):
+                use_response, max_chunk = await self._async_prepare_write()
+                async with self._async_hold_write_lock(PRIORITY_CONTROL):
+                    await self._async_write_chunks(payload, use_response, max_chunk)
+            return True
+        return await self._send_stream(_iter_bytes(payload), channel)
+
+    async def _send_stream(self, blocks: AsyncIterator[bytes], channel: str) -> bool:
+        """Bulk-transfer a payload produced block by block.
+
+        Blocks are re-cut into max-size chunks as they arrive, so only a
+        couple of chunks are ever buffered. Returns False if superseded.
+        """
+        with self.profiler.span(STAGE_SEND):
+            return await self._async_send_stream(blocks, channel)
+
+    async def _async_send_stream(
+        self, blocks: AsyncIterator[bytes], channel: str
+    ) -> bool:
+        use_response, max_chunk = await self._async_prepare_write()
+        generation = self._bulk_generation.get(channel, 0) + 1
+        self._bulk_generation[channel] = generation
+
+        sent = 0
+        pending = bytearray()
+
+        # Airtime on the adapter is shared round-robin with other panels.
+        turn = TransferTurn(self._scheduler, self)
 
-    async def _send_raw(self, payload: bytearray) -> None:
-        """Chunked write with notify enabled and max-size detection."""
+        async def write_chunk(chunk: bytes) -> bool:
+            nonlocal sent
+            if self._bulk_generation[channel] != generation:
+                _LOGGER.debug(
+                    "Bulk transfer on %s superseded after %d bytes", channel, sent
+                )
+                if sent:
+                    # Let the device drop the half-received frame.
+                    await self._send_raw(self._build_command_frame("abort_transfer"))
+                return False
+
+            with self.profiler.span(STAGE_QUEUE_WAIT):
+                await turn.async_before_chunk()
+
+            async with self._async_hold_write_lock(PRIORITY_BULK):
+                await self._async_write(chunk, use_response)
+            sent += len(chunk)
+            # Tiny pacing to avoid overrun on some stacks
+            await asyncio.sleep(0.005)
+            return True
+
+        # Bulk transfers never interleave; only control frames cut in.
+        with self.profiler.span(STAGE_QUEUE_WAIT):
+            await self._bulk_lock.acquire()
+        try:
+            async for block in blocks:
+                pending.extend(block)
+                while len(pending) >= max_chunk:
+                    if not await write_chunk(bytes(pending[:max_chunk])):
+                        return False
+                    del pending[:max_chunk]
+            if pending and not await write_chunk(bytes(pending)):
+                return False
+        except (UpdateFailed, asyncio.CancelledError):
+            # Failed, or stopped like a stream that was replaced.
+            if sent and self.client and self.client.is_connected:
+                # Don't leave a half frame in the device's receive buffer.
+                try:
+                    await self._send_raw(self._build_command_frame("abort_transfer"))
+                except UpdateFailed:
+                    pass
+            raise
+        finally:
+            turn.release()
+            self._bulk_lock.release()
+            await blocks.aclose()
+        return True
+
+    @asynccontextmanager
+    async def _async_hold_write_lock(self, priority: int) -> AsyncIterator[None]:
+        """Hold the write lock, timing how long we queued for it."""
+        with self.profiler.span(STAGE_QUEUE_WAIT):
+            await self._write_lock.acquire(priority)
+        try:
+            yield
+        finally:
+            self._write_lock.release()
+
+    async def _async_prepare_write(self) -> tuple[bool, int]:
+        """Connect if needed and return (use_response, max_chunk)."""
         if not self.client or not self.client.is_connected:
-            await self._async_connect()
+            if not await self._async_connect():
+                raise UpdateFailed(
+                    f"No free connection slot for {self.device_address}"
+                )
         if not self.write_characteristic:
             raise UpdateFailed("Writable characteristic not found")
 
@@ -265,24 +1241,49 @@ class IPixelColorDataUpdateCoordinator(DataUpdateCoordinator):
         props = set(self.write_characteristic.properties or [])
         use_response = "write" in props and "write_without_response" not in props
 
-        # Determine max chunk size
-        max_chunk = await self._resolve_max_write_without_response_size(self.write_characteristic)
-        _LOGGER.debug(
-            "Write props=%s | response=%s | max_chunk=%d | total=%d",
-            props, use_response, max_chunk, len(payload)
+        # Determine max chunk size once per connection, and again whenever
+        # the link reports a renegotiated size.
+        current = getattr(
+            self.write_characteristic, "max_write_without_response_size", None
         )
+        if isinstance(current, int) and current > 20 and current != self._max_chunk:
+            self._max_chunk = None
+        if self._max_chunk is None:
+            self._max_chunk = await self._resolve_max_write_without_response_size(
+                self.write_characteristic
+            )
+            _LOGGER.debug(
+                "Write props=%s | response=%s | max_chunk=%d",
+                props, use_response, self._max_chunk
+            )
+        return use_response, self._max_chunk
 
+    async def _async_write_chunks(
+        self, payload: bytearray, use_response: bool, max_chunk: int
+    ) -> None:
         # Chunked transfer
         offset = 0
         while offset < len(payload):
             chunk = payload[offset : offset + max_chunk]
-            await self.client.write_gatt_char(
-                self.write_characteristic, chunk, response=use_response
-            )
+            await self._async_write(chunk, use_response)
             offset += len(chunk)
             # Tiny pacing to avoid overrun on some stacks
             await asyncio.sleep(0.005)
 
+    async def _async_write(self, chunk: bytes, use_response: bool) -> None:
+        """Issue one GATT write."""
+        self.last_activity = self.hass.loop.time()
+        try:
+            with self.profiler.span(STAGE_GATT_WRITE):
+                await self.client.write_gatt_char(
+                    self.write_characteristic, chunk, response=use_response
+                )
+        except BleakError as err:
+            # The link dropped or was renegotiated; re-resolve the chunk size
+            # on the next transfer.
+            self._max_chunk = None
+            raise UpdateFailed(f"Write failed: {err}") from err
+
     async def _resolve_max_write_without_response_size(
         self, char: BleakGATTCharacteristic
     ) -> int:
@@ -310,11 +1311,12 @@ class IPixelColorDataUpdateCoordinator(DataUpdateCoordinator):
 
     async def async_shutdown(self) -> None:
         """Disconnect gracefully."""
-        if self.client and self.client.is_connected:
-            # Stop notifications
-            for ch in self.notify_characteristics:
-                try:
-                    await self.client.stop_notify(ch)
-                except Exception:
-                    pass
-            await self.client.disconnect()
\ No newline at end of file
+        await self.async_stop_playlist()
+        await self.async_stop_stream()
+        self.async_stop_layout()
+        self.async_stop_drawing()
+        self._cancel_pending_text()
+        if self._reconcile_task is not None:
+            self._reconcile_task.cancel()
+        await self.async_release_connection()
+        self._scheduler.remove_panel(self)
\ No newline at end of file
@@ -0,0 +1,214 @@
+"""In-memory framebuffer for DIY drawing on iPixel Color displays."""
+from __future__ import annotations
+
+import asyncio
+import logging
+from typing import TYPE_CHECKING, Any, Optional
+
+import numpy as np
+from PIL import Image
+
+from homeassistant.core import CALLBACK_TYPE, callback
+from homeassistant.helpers.event import async_call_later
+
+if TYPE_CHECKING:
+    from .coordinator import IPixelColorDataUpdateCoordinator
+
+_LOGGER = logging.getLogger(__name__)
+
+# Drawing operations are collected for this long before one flush
+FLUSH_TICK = 0.1
+# Wait before retrying a failed flush
+RETRY_DELAY = 5.0
+
+
+def load_image(path: str, width: Optional[int], height: Optional[int]) -> np.ndarray:
+    """Load an image file as an RGB pixel array, optionally resized (blocking)."""
+    with Image.open(path) as img:
+        img = img.convert("RGB")
+        if width and height:
+            img = img.resize((width, height), Image.Resampling.BILINEAR)
+        return np.asarray(img, dtype=np.uint8)
+
+
+class IPixelColorFramebuffer:
+    """Draw into a height x width x 3 array and flush changes once per tick.
+
+    Every primitive only touches the array and grows the dirty rectangle.
+    At the end of the tick the dirty rectangle goes out as a single
+    draw_region (or a full display_frame when the whole panel changed), so a
+    scripted drawing costs one transfer per tick instead of one per primitive.
+    """
+
+    def __init__(
+        self,
+        coordinator: IPixelColorDataUpdateCoordinator,
+        width: int,
+        height: int,
+    ) -> None:
+        """Initialize an all-black framebuffer."""
+        self._coordinator = coordinator
+        self.width = width
+        self.height = height
+        self.pixels = np.zeros((height, width, 3), dtype=np.uint8)
+        # Dirty rectangle as (x0, y0, x1, y1), end-exclusive
+        self._dirty: Optional[tuple[int, int, int, int]] = None
+        self._flush_timer: Optional[CALLBACK_TYPE] = None
+        self._flush_lock = asyncio.Lock()
+
+    # Primitives
+
+    def fill(self, color: tuple[int, int, int]) -> None:
+        """Fill the whole framebuffer."""
+        self.pixels[:, :] = color
+        self._mark(0, 0, self.width, self.height)
+
+    def pixel(self, x: int, y: int, color: tuple[int, int, int]) -> None:
+        """Set one pixel."""
+        if 0 <= x < self.width and 0 <= y < self.height:
+            self.pixels[y, x] = color
+            self._mark(x, y, x + 1, y + 1)
+
+    def line(
+        self, x0: int, y0: int, x1: int, y1: int, color: tuple[int, int, int]
+    ) -> None:
+        """Draw a straight line between two points (inclusive)."""
+        steps = max(abs(x1 - x0), abs(y1 - y0)) + 1
+        xs = np.rint(np.linspace(x0, x1, steps)).astype(int)
+        ys = np.rint(np.linspace(y0, y1, steps)).astype(int)
+        inside = (xs >= 0) & (xs < self.width) & (ys >= 0) & (ys < self.height)
+        xs, ys = xs[inside], ys[inside]
+        if xs.size:
+            self.pixels[ys, xs] = color
+            self._mark(int(xs.min()), int(ys.min()), int(xs.max()) + 1, int(ys.max()) + 1)
+
+    def rect(
+        self,
+        x: int,
+        y: int,
+        width: int,
+        height: int,
+        color: tuple[int, int, int],
+        fill: bool = False,
+    ) -> None:
+        """Draw a rectangle outline, or a filled rectangle."""
+        if fill:
+            x0, y0, x1, y1 = self._clip(x, y, x + width, y + height)
+            if x0 < x1 and y0 < y1:
+                self.pixels[y0:y1, x0:x1] = color
+                self._mark(x0, y0, x1, y1)
+            return
+        right, bottom = x + width - 1, y + height - 1
+        self.line(x, y, right, y, color)
+        self.line(x, bottom, right, bottom, color)
+        self.line(x, y, x, bottom, color)
+        self.line(right, y, right, bottom, color)
+
+    def blit(self, x: int, y: int, source: np.ndarray) -> None:
+        """Copy an RGB pixel array with its top-left corner at (x, y)."""
+        x0, y0, x1, y1 = self._clip(x, y, x + source.shape[1], y + source.shape[0])
+        if x0 < x1 and y0 < y1:
+            self.pixels[y0:y1, x0:x1] = source[y0 - y : y1 - y, x0 - x : x1 - x, :3]
+            self._mark(x0, y0, x1, y1)
+
+    async def async_apply(self, operations: list[dict[str, Any]]) -> None:
+        """Apply validated draw operations and schedule a flush."""
+        hass = self._coordinator.hass
+        for op in operations:
+            kind = op["op"]
+            color = tuple(op.get("color", (255, 255, 255))[:3])
+            if kind == "fill":
+                self.fill(color)
+            elif kind == "clear":
+                self.fill((0, 0, 0))
+            elif kind == "pixel":
+                self.pixel(op["x"], op["y"], color)
+            elif kind == "line":
+                self.line(op["x"], op["y"], op["x2"], op["y2"], color)
+            elif kind == "rect":
+                self.rect(
+                    op["x"], op["y"], op["width"], op["height"], color, op["fill"]
+                )
+            elif kind == "blit":
+                source = await hass.async_add_executor_job(
+                    load_image, op["image_path"], op.get("width"), op.get("height")
+                )
+                self.blit(op["x"], op["y"], source)
+        self.async_schedule_flush()
+
+    # Flushing
+
+    @callback
+    def async_schedule_flush(self) -> None:
+        """Flush the dirty rectangle at the end of the current tick."""
+        if self._dirty is None or self._flush_timer is not None:
+            return
+        self._flush_timer = async_call_later(
+            self._coordinator.hass, FLUSH_TICK, self._async_flush
+        )
+
+    @callback
+    def async_redraw(self) -> None:
+        """Send the whole framebuffer again, e.g. after an outage."""
+        self._mark(0, 0, self.width, self.height)
+        # Don't wait out a pending retry
+        self.async_cancel()
+        self.async_schedule_flush()
+
+    @callback
+    def async_cancel(self) -> None:
+        """Drop a scheduled flush."""
+        if self._flush_timer is not None:
+            self._flush_timer()
+            self._flush_timer = None
+
+    async def _async_flush(self, _now: Any = None) -> None:
+        self._flush_timer = None
+        # One flush at a time; drawing during a slow flush just grows the
+        # dirty rectangle for the next one.
+        async with self._flush_lock:
+            dirty, self._dirty = self._dirty, None
+            if dirty is None:
+                return
+            x0, y0, x1, y1 = dirty
+            try:
+                if (x0, y0, x1, y1) == (0, 0, self.width, self.height):
+                    await self._coordinator.async_send_frame(
+                        self.pixels.tobytes(), self.width, self.height
+                    )
+                else:
+                    region = np.ascontiguousarray(self.pixels[y0:y1, x0:x1])
+                    await self._coordinator.async_send_region(
+                        "diy", x0, y0, x1 - x0, y1 - y0, region.tobytes()
+                    )
+            except Exception as err:
+                _LOGGER.warning("Framebuffer flush failed: %s", err)
+                # Keep the area dirty and retry, and redraw everything once
+                # the panel has reconnected.
+                self._mark(x0, y0, x1, y1)
+                if self._flush_timer is None:
+                    self._flush_timer = async_call_later(
+                        self._coordinator.hass, RETRY_DELAY, self._async_retry_flush
+                    )
+                self._coordinator.async_redraw_on_reconnect()
+
+    async def _async_retry_flush(self, _now: Any = None) -> None:
+        # Nobody is waiting for a retry: it must not disconnect another panel.
+        with self._coordinator.background():
+            await self._async_flush()
+
+    # Helpers
+
+    def _clip(self, x0: int, y0: int, x1: int, y1: int) -> tuple[int, int, int, int]:
+        return (
+            max(0, x0),
+            max(0, y0),
+            min(self.width, x1),
+            min(self.height, y1),
+        )
+
+    def _mark(self, x0: int, y0: int, x1: int, y1: int) -> None:
+        if self._dirty is not None:
+            dx0, dy0, dx1, dy1 = self._dirty
+            x0, y0, x1, y1 = min(x0, dx0), min(y0, dy0), max(x1, dx1), max(y1, dy1)
+        self._dirty = (x0, y0, x1, y1)
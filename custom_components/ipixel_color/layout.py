@@ -0,0 +1,150 @@
+"""Template-driven dashboard layouts for iPixel Color displays."""
+from __future__ import annotations
+
+import logging
+from dataclasses import dataclass
+from datetime import timedelta
+from typing import TYPE_CHECKING, Optional
+
+from PIL import Image, ImageDraw, ImageFont
+
+from homeassistant.core import Event, callback
+from homeassistant.exceptions import TemplateError
+from homeassistant.helpers.debounce import Debouncer
+from homeassistant.helpers.event import (
+    TrackTemplate,
+    TrackTemplateResult,
+    TrackTemplateResultInfo,
+    async_track_template_result,
+)
+from homeassistant.helpers.template import Template
+
+if TYPE_CHECKING:
+    from .coordinator import IPixelColorDataUpdateCoordinator
+
+_LOGGER = logging.getLogger(__name__)
+
+
+@dataclass
+class LayoutRegion:
+    """A rectangle of the panel whose text comes from a template."""
+
+    name: str
+    template: Template
+    x: int
+    y: int
+    width: int
+    height: int
+    color: tuple[int, int, int] = (255, 255, 255)
+
+
+def render_region(
+    text: str, width: int, height: int, color: tuple[int, int, int]
+) -> bytes:
+    """Draw text into a width x height RGB888 bitmap (blocking)."""
+    img = Image.new("RGB", (width, height))
+    ImageDraw.Draw(img).text((0, 0), text, fill=color, font=ImageFont.load_default())
+    return img.tobytes()
+
+
+class IPixelColorLayout:
+    """Keep layout regions in sync with the entities their templates use.
+
+    Template dependencies are tracked by async_track_template_result, so a
+    state change re-renders only the regions whose output changed. Template
+    renders and panel sends are both rate-limited to min_interval; changes
+    arriving during the cooldown are coalesced into one trailing send.
+    """
+
+    def __init__(
+        self,
+        coordinator: IPixelColorDataUpdateCoordinator,
+        regions: list[LayoutRegion],
+        min_interval: float,
+    ) -> None:
+        """Initialize the layout."""
+        self._coordinator = coordinator
+        self._regions = regions
+        self._min_interval = min_interval
+        self._dirty: dict[str, str] = {}
+        # Latest rendered text of every region, for redraws
+        self._texts: dict[str, str] = {}
+        self._info: Optional[TrackTemplateResultInfo] = None
+        self._debouncer = Debouncer(
+            coordinator.hass,
+            _LOGGER,
+            cooldown=min_interval,
+            immediate=True,
+            function=self._async_flush,
+        )
+
+    @callback
+    def async_start(self) -> None:
+        """Subscribe to the templates and render every region once."""
+        hass = self._coordinator.hass
+        rate_limit = timedelta(seconds=self._min_interval)
+        track_templates = []
+        for region in self._regions:
+            region.template.hass = hass
+            track_templates.append(TrackTemplate(region.template, None, rate_limit))
+
+        self._info = async_track_template_result(
+            hass, track_templates, self._async_on_template_result
+        )
+        self._info.async_refresh()
+
+    @callback
+    def async_stop(self) -> None:
+        """Unsubscribe and drop pending renders."""
+        if self._info is not None:
+            self._info.async_remove()
+            self._info = None
+        self._debouncer.async_cancel()
+        self._dirty.clear()
+
+    @callback
+    def async_redraw(self) -> None:
+        """Send every region again, e.g. after the panel was unreachable."""
+        self._dirty.update(self._texts)
+        if self._dirty:
+            self._coordinator.hass.async_create_task(self._debouncer.async_call())
+
+    @callback
+    def _async_on_template_result(
+        self, event: Optional[Event], updates: list[TrackTemplateResult]
+    ) -> None:
+        for update in updates:
+            region = next(r for r in self._regions if r.template is update.template)
+            if isinstance(update.result, TemplateError):
+                _LOGGER.warning(
+                    "Layout region %s failed to render: %s", region.name, update.result
+                )
+                continue
+            self._dirty[region.name] = self._texts[region.name] = str(update.result)
+
+        if self._dirty:
+            self._coordinator.hass.async_create_task(self._debouncer.async_call())
+
+    async def _async_flush(self) -> None:
+        """Render and send the regions that changed since the last flush."""
+        dirty, self._dirty = self._dirty, {}
+        for region in self._regions:
+            if region.name not in dirty:
+                continue
+            await self._async_send_region(region, dirty[region.name])
+
+    async def _async_send_region(self, region: LayoutRegion, text: str) -> None:
+        coordinator = self._coordinator
+        pixels = await coordinator.hass.async_add_executor_job(
+            render_region, text, region.width, region.height, region.color
+        )
+        try:
+            await coordinator.async_send_region(
+                region.name, region.x, region.y, region.width, region.height, pixels
+            )
+        except Exception as err:
+            _LOGGER.warning("Layout region %s failed to send: %s", region.name, err)
+            # Retry with the newest text on the next flush, and at the
+            # latest once the panel has reconnected.
+            self._dirty.setdefault(region.name, text)
+            coordinator.async_redraw_on_reconnect()
@@ -89,11 +89,14 @@ class IPixelColorLight(CoordinatorEntity, LightEntity):
         rgb_color = kwargs.get(ATTR_RGB_COLOR)
         effect = kwargs.get(ATTR_EFFECT)
 
-        await self.coordinator.async_turn_on(
-            brightness=brightness,
-            rgb_color=rgb_color,
-            effect=effect,
-        )
+        # Power, brightness, color and effect go out as one radio write
+        async with self.coordinator.async_batch():
+            await self.coordinator.async_turn_on(
+                brightness=brightness,
+                rgb_color=rgb_color,
+                effect=effect,
+            )
+        await self.coordinator.async_request_refresh()
 
     async def async_turn_off(self, **kwargs: Any) -> None:
         """Turn off the light."""
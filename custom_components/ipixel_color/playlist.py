@@ -0,0 +1,133 @@
+"""Playlist rotation for iPixel Color displays."""
+from __future__ import annotations
+
+import asyncio
+import logging
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Optional
+
+from bleak import BleakError
+
+from homeassistant.helpers.update_coordinator import UpdateFailed
+
+if TYPE_CHECKING:
+    from .coordinator import IPixelColorDataUpdateCoordinator
+
+_LOGGER = logging.getLogger(__name__)
+
+# Backoff between attempts to prepare an item while the panel is unreachable
+RETRY_MIN = 5.0
+RETRY_MAX = 60.0
+
+
+@dataclass
+class PlaylistItem:
+    """One entry of a playlist."""
+
+    content_type: str
+    content: str
+    dwell: float
+    color: Optional[list[int]] = None
+    speed: int = 1
+
+
+class IPixelColorPlaylist:
+    """Rotate content items, preparing the next one while the current dwells."""
+
+    def __init__(
+        self,
+        coordinator: IPixelColorDataUpdateCoordinator,
+        items: list[PlaylistItem],
+        repeat: bool = True,
+    ) -> None:
+        """Initialize the playlist."""
+        self._coordinator = coordinator
+        self._items = items
+        self._repeat = repeat
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def running(self) -> bool:
+        """Return True while the rotation task is alive."""
+        return self._task is not None and not self._task.done()
+
+    def start(self) -> None:
+        """Start the rotation in the background."""
+        if not self._items or self.running:
+            return
+        self._task = self._coordinator.hass.async_create_background_task(
+            self._async_run(), f"ipixel_color playlist {self._coordinator.device_address}"
+        )
+
+    async def async_stop(self) -> None:
+        """Cancel the rotation and wait for it to finish."""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    def _next_index(self, index: int) -> Optional[int]:
+        if index + 1 < len(self._items):
+            return index + 1
+        return 0 if self._repeat else None
+
+    async def _async_prepare_from(self, index: int) -> Optional[tuple[int, Any]]:
+        """Prepare the first item from index on that can be prepared.
+
+        Preparing uploads over BLE, so connection failures are retried with
+        backoff: an outage pauses the rotation instead of ending it. Items
+        that can never be prepared (e.g. a missing file) are skipped.
+        """
+        delay = RETRY_MIN
+        skipped = 0
+        while skipped < len(self._items):
+            try:
+                item = self._items[index]
+                # Uploads ahead of time may wait for a free connection slot.
+                with self._coordinator.background():
+                    prepared = await self._coordinator.async_prepare_content(item)
+                return index, prepared
+            except (UpdateFailed, BleakError, asyncio.TimeoutError) as err:
+                _LOGGER.debug(
+                    "Playlist item %d not uploaded, retrying in %ss: %s",
+                    index, delay, err,
+                )
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, RETRY_MAX)
+                continue
+            except Exception as err:  # skip broken items, keep rotating
+                _LOGGER.warning("Playlist item %d failed to prepare: %s", index, err)
+            skipped += 1
+            next_index = self._next_index(index)
+            if next_index is None:
+                return None
+            index = next_index
+        return None
+
+    async def _async_run(self) -> None:
+        upcoming = await self._async_prepare_from(0)
+
+        while upcoming is not None:
+            index, prepared = upcoming
+            try:
+                await self._coordinator.async_show_prepared(prepared)
+            except Exception as err:
+                _LOGGER.warning("Playlist item %d failed to show: %s", index, err)
+
+            next_index = self._next_index(index)
+            if next_index is None:
+                return
+
+            # Encode (and upload, where the device can hold it) the next item
+            # while the current one is on screen.
+            prepare = asyncio.ensure_future(self._async_prepare_from(next_index))
+            try:
+                await asyncio.sleep(self._items[index].dwell)
+                upcoming = await prepare
+            except asyncio.CancelledError:
+                prepare.cancel()
+                raise
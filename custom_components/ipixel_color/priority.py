@@ -0,0 +1,53 @@
+"""Priority-aware write lock for the iPixel Color send path."""
+from __future__ import annotations
+
+import asyncio
+import heapq
+import itertools
+
+# Lower value wins
+PRIORITY_CONTROL = 0
+PRIORITY_BULK = 1
+
+
+class PriorityLock:
+    """Mutex whose waiters are served by priority, FIFO within a priority.
+
+    Bulk transfers take the lock once per chunk, so a control frame that
+    arrives mid-transfer goes out before the next chunk.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the lock."""
+        self._locked = False
+        self._waiters: list[tuple[int, int, asyncio.Future]] = []
+        self._seq = itertools.count()
+
+    def locked(self) -> bool:
+        """Return True if the lock is held."""
+        return self._locked
+
+    async def acquire(self, priority: int) -> None:
+        """Wait until the lock is handed to us."""
+        if not self._locked and not self._waiters:
+            self._locked = True
+            return
+
+        fut = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._seq), fut))
+        try:
+            await fut
+        except asyncio.CancelledError:
+            if fut.done() and not fut.cancelled():
+                # Ownership was handed over just before the cancel landed.
+                self.release()
+            raise
+
+    def release(self) -> None:
+        """Hand the lock to the most urgent waiter, or unlock."""
+        while self._waiters:
+            _, _, fut = heapq.heappop(self._waiters)
+            if not fut.done():
+                fut.set_result(None)
+                return
+        self._locked = False
@@ -0,0 +1,91 @@
+"""Lightweight per-stage timing for the iPixel Color send path."""
+from __future__ import annotations
+
+import math
+import time
+from collections import defaultdict, deque
+from contextlib import nullcontext
+from typing import Any, ContextManager
+
+# Samples kept per stage while a capture runs
+MAX_SAMPLES = 10000
+
+STAGE_FILE_IO = "file_io"
+STAGE_ENCODE = "encode"
+STAGE_CRC = "crc"
+STAGE_QUEUE_WAIT = "queue_wait"
+STAGE_GATT_WRITE = "gatt_write"
+STAGE_SEND = "send"
+
+_NOOP = nullcontext()
+
+
+class _Span:
+    """Time one stage and hand the duration to the profiler."""
+
+    __slots__ = ("_profiler", "_stage", "_start")
+
+    def __init__(self, profiler: StageProfiler, stage: str) -> None:
+        self._profiler = profiler
+        self._stage = stage
+        self._start = 0.0
+
+    def __enter__(self) -> None:
+        self._start = time.perf_counter()
+
+    def __exit__(self, *exc: Any) -> None:
+        self._profiler.record(self._stage, time.perf_counter() - self._start)
+
+
+def _percentile(ordered: list[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+class StageProfiler:
+    """Collect stage durations while a capture is running.
+
+    When no capture is running, span() returns a shared no-op context
+    manager, so instrumented code pays one attribute check per stage.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the profiler."""
+        self.active = False
+        self._samples: dict[str, deque[float]] = defaultdict(
+            lambda: deque(maxlen=MAX_SAMPLES)
+        )
+
+    def span(self, stage: str) -> ContextManager[None]:
+        """Return a context manager timing stage (no-op when inactive)."""
+        if not self.active:
+            return _NOOP
+        return _Span(self, stage)
+
+    def record(self, stage: str, seconds: float) -> None:
+        """Record one duration for stage."""
+        if self.active:
+            self._samples[stage].append(seconds)
+
+    def start(self) -> None:
+        """Start a fresh capture."""
+        self._samples.clear()
+        self.active = True
+
+    def stop(self) -> dict[str, dict[str, float]]:
+        """End the capture and return per-stage statistics in milliseconds."""
+        self.active = False
+        summary: dict[str, dict[str, float]] = {}
+        for stage, samples in self._samples.items():
+            ordered = sorted(samples)
+            summary[stage] = {
+                "count": len(ordered),
+                "total_ms": round(sum(ordered) * 1000, 3),
+                "p50_ms": round(_percentile(ordered, 50) * 1000, 3),
+                "p90_ms": round(_percentile(ordered, 90) * 1000, 3),
+                "p99_ms": round(_percentile(ordered, 99) * 1000, 3),
+                "max_ms": round(ordered[-1] * 1000, 3),
+            }
+        self._samples.clear()
+        return summary
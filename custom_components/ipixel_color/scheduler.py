@@ -0,0 +1,213 @@
+"""Fleet-wide connection and airtime scheduling per Bluetooth adapter."""
+from __future__ import annotations
+
+import asyncio
+import logging
+from collections import deque
+from typing import TYPE_CHECKING, Optional
+
+from homeassistant.components import bluetooth
+from homeassistant.components.bluetooth import BluetoothServiceInfoBleak
+from homeassistant.core import HomeAssistant
+
+if TYPE_CHECKING:
+    from .coordinator import IPixelColorDataUpdateCoordinator
+
+_LOGGER = logging.getLogger(__name__)
+
+DEFAULT_ADAPTER = "default"
+
+
+class FairSemaphore:
+    """Counting semaphore that hands out slots strictly first come, first served."""
+
+    def __init__(self, value: int) -> None:
+        """Initialize the semaphore."""
+        self._value = value
+        self._waiters: deque[asyncio.Future] = deque()
+
+    async def acquire(self) -> None:
+        """Wait for a slot."""
+        if self._value > 0 and not self._waiters:
+            self._value -= 1
+            return
+
+        fut = asyncio.get_running_loop().create_future()
+        self._waiters.append(fut)
+        try:
+            await fut
+        except asyncio.CancelledError:
+            if fut.done() and not fut.cancelled():
+                self.release()
+            else:
+                # release() may already have popped and skipped it
+                try:
+                    self._waiters.remove(fut)
+                except ValueError:
+                    pass
+            raise
+
+    def release(self) -> None:
+        """Return a slot, handing it straight to the oldest waiter."""
+        while self._waiters:
+            fut = self._waiters.popleft()
+            if not fut.done():
+                fut.set_result(None)
+                return
+        self._value += 1
+
+
+class _AdapterState:
+    """Connections and transfer slots of one adapter."""
+
+    def __init__(self, max_transfers: int) -> None:
+        self.connected: set[IPixelColorDataUpdateCoordinator] = set()
+        self.changed = asyncio.Event()
+        self.transfers = FairSemaphore(max_transfers)
+
+
+class IPixelColorScheduler:
+    """Share adapter capacity fairly between all panels.
+
+    Each adapter allows at most max_connections panels to be connected and
+    max_transfers bulk transfers to run at once. When the connection slots
+    are full, the least recently active idle panel is disconnected to make
+    room. Bulk transfers hold a transfer slot for a quantum of chunks and
+    then go to the back of the queue, so concurrent uploads are interleaved
+    round-robin instead of starving each other.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        max_connections: int,
+        max_transfers: int,
+        quantum: int,
+    ) -> None:
+        """Initialize the scheduler."""
+        self.hass = hass
+        self.max_connections = max_connections
+        self.max_transfers = max_transfers
+        self.quantum = quantum
+        self._adapters: dict[str, _AdapterState] = {}
+        self._panel_adapter: dict[IPixelColorDataUpdateCoordinator, str] = {}
+
+    def _service_info(self, address: str) -> Optional[BluetoothServiceInfoBleak]:
+        try:
+            return bluetooth.async_last_service_info(
+                self.hass, address, connectable=True
+            )
+        except Exception:  # bluetooth integration not loaded
+            return None
+
+    def adapter_for(self, address: str) -> str:
+        """Return the adapter (or proxy) currently serving address."""
+        info = self._service_info(address)
+        return info.source if info is not None else DEFAULT_ADAPTER
+
+    def last_seen(self, address: str) -> Optional[float]:
+        """Return when address last advertised, or None if never seen."""
+        info = self._service_info(address)
+        return info.time if info is not None else None
+
+    def _state(self, panel: IPixelColorDataUpdateCoordinator) -> _AdapterState:
+        adapter = self._panel_adapter.get(panel)
+        if adapter is None:
+            adapter = self.adapter_for(panel.device_address)
+            self._panel_adapter[panel] = adapter
+        if adapter not in self._adapters:
+            self._adapters[adapter] = _AdapterState(self.max_transfers)
+        return self._adapters[adapter]
+
+    async def async_acquire_connection(
+        self, panel: IPixelColorDataUpdateCoordinator, evict: bool = True
+    ) -> bool:
+        """Wait until panel may hold a connection on its adapter.
+
+        With evict False nobody is disconnected and nothing is waited for:
+        False is returned at once if no slot is free.
+        """
+        # The panel may have moved to another adapter or proxy since its
+        # last connection.
+        adapter = self.adapter_for(panel.device_address)
+        if self._panel_adapter.get(panel, adapter) != adapter:
+            self.release_connection(panel)
+        self._panel_adapter[panel] = adapter
+        state = self._state(panel)
+
+        while True:
+            if panel in state.connected or len(state.connected) < self.max_connections:
+                state.connected.add(panel)
+                return True
+            if not evict:
+                return False
+
+            idle = [p for p in state.connected if p.is_idle]
+            if idle:
+                victim = min(idle, key=lambda p: p.last_activity)
+                _LOGGER.debug(
+                    "Disconnecting idle %s to make room for %s",
+                    victim.device_address, panel.device_address,
+                )
+                state.connected.discard(victim)
+                await victim.async_release_connection()
+                continue
+
+            state.changed.clear()
+            await state.changed.wait()
+
+    def release_connection(self, panel: IPixelColorDataUpdateCoordinator) -> None:
+        """Give up the connection slot of panel."""
+        adapter = self._panel_adapter.get(panel)
+        state = self._adapters.get(adapter) if adapter else None
+        if state is not None and panel in state.connected:
+            state.connected.discard(panel)
+            state.changed.set()
+
+    def transfer_slots(
+        self, panel: IPixelColorDataUpdateCoordinator
+    ) -> FairSemaphore:
+        """Return the transfer slots of the adapter serving panel."""
+        return self._state(panel).transfers
+
+    def transfer_finished(self, panel: IPixelColorDataUpdateCoordinator) -> None:
+        """Wake panels waiting for a connection now that panel may be idle."""
+        state = self._adapters.get(self._panel_adapter.get(panel, ""))
+        if state is not None:
+            state.changed.set()
+
+    def remove_panel(self, panel: IPixelColorDataUpdateCoordinator) -> None:
+        """Forget a panel that is being unloaded."""
+        self.release_connection(panel)
+        self._panel_adapter.pop(panel, None)
+
+
+class TransferTurn:
+    """Hold the adapter's transfer slot for one quantum of chunks at a time."""
+
+    def __init__(
+        self, scheduler: IPixelColorScheduler, panel: IPixelColorDataUpdateCoordinator
+    ) -> None:
+        """Initialize the turn."""
+        self._scheduler = scheduler
+        self._panel = panel
+        self._slots: Optional[FairSemaphore] = None
+        self._chunks = 0
+
+    async def async_before_chunk(self) -> None:
+        """Make sure we hold a slot, yielding it after every quantum."""
+        if self._slots is not None and self._chunks >= self._scheduler.quantum:
+            self.release()
+        if self._slots is None:
+            slots = self._scheduler.transfer_slots(self._panel)
+            await slots.acquire()
+            self._slots = slots
+            self._chunks = 0
+        self._chunks += 1
+
+    def release(self) -> None:
+        """Give the slot back."""
+        if self._slots is not None:
+            self._slots.release()
+            self._slots = None
+        self._scheduler.transfer_finished(self._panel)
@@ -1,7 +1,7 @@
 """Sensor platform for iPixel Color integration."""
 from __future__ import annotations
 
-from homeassistant.components.sensor import SensorEntity
+from homeassistant.components.sensor import SensorEntity, SensorStateClass
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
@@ -21,6 +21,7 @@ async def async_setup_entry(
     async_add_entities([
         IPixelColorStatusSensor(coordinator, entry),
         IPixelColorFirmwareSensor(coordinator, entry),
+        IPixelColorStreamFpsSensor(coordinator, entry),
     ])
 
 
@@ -47,6 +48,13 @@ class IPixelColorStatusSensor(CoordinatorEntity, SensorEntity):
         """Return the connection status."""
         return self.coordinator.data.get("connection_status", "disconnected")
 
+    @property
+    def extra_state_attributes(self) -> dict[str, float]:
+        """Return the health-poll interval currently in effect."""
+        return {
+            "poll_interval": self.coordinator.update_interval.total_seconds(),
+        }
+
 
 class IPixelColorFirmwareSensor(CoordinatorEntity, SensorEntity):
     """Representation of iPixel Color firmware version sensor."""
@@ -70,3 +78,29 @@ class IPixelColorFirmwareSensor(CoordinatorEntity, SensorEntity):
     def native_value(self) -> str:
         """Return the firmware version."""
         return self.coordinator.data.get("firmware_version", "Unknown")
+
+
+class IPixelColorStreamFpsSensor(CoordinatorEntity, SensorEntity):
+    """Representation of the frame rate achieved by the live stream."""
+
+    _attr_has_entity_name = True
+    _attr_name = "Stream FPS"
+    _attr_state_class = SensorStateClass.MEASUREMENT
+    _attr_native_unit_of_measurement = "fps"
+
+    def __init__(
+        self,
+        coordinator: IPixelColorDataUpdateCoordinator,
+        entry: ConfigEntry,
+    ) -> None:
+        """Initialize the sensor."""
+        super().__init__(coordinator)
+        self._attr_unique_id = f"{entry.entry_id}_sensor_stream_fps"
+        self._attr_device_info = {
+            "identifiers": {(DOMAIN, entry.data["device_address"])},
+        }
+
+    @property
+    def native_value(self) -> float:
+        """Return the achieved stream frame rate."""
+        return self.coordinator.data.get("stream_fps", 0.0)
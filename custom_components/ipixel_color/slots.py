@@ -0,0 +1,107 @@
+"""Program slot bookkeeping for iPixel Color displays."""
+from __future__ import annotations
+
+import logging
+from collections import OrderedDict
+from typing import Any, Optional
+
+from homeassistant.core import HomeAssistant
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers.storage import Store
+
+from .const import DOMAIN
+
+_LOGGER = logging.getLogger(__name__)
+
+STORAGE_VERSION = 1
+SAVE_DELAY = 10
+
+
+class ProgramSlotTable:
+    """Track which content hash lives in which device memory slot.
+
+    Entries are kept in least-recently-used order (oldest first) and
+    persisted, so content uploaded before a restart is still selectable.
+    A slot handed out by allocate() stays reserved until commit() or
+    rollback(), so overlapping uploads never share a slot.
+    """
+
+    def __init__(self, hass: HomeAssistant, entry_id: str, size: int) -> None:
+        """Initialize the table."""
+        self._store: Store = Store(
+            hass, STORAGE_VERSION, f"{DOMAIN}.program_slots.{entry_id}"
+        )
+        self._size = size
+        self._slots: OrderedDict[str, int] = OrderedDict()
+        # Allocated slots awaiting commit, with the entry evicted for each
+        self._pending: dict[int, Optional[str]] = {}
+
+    async def async_load(self) -> None:
+        """Restore the table from storage."""
+        stored = await self._store.async_load()
+        if not stored:
+            return
+        for content_hash, slot in stored.get("slots", []):
+            if 0 <= slot < self._size and slot not in self._slots.values():
+                self._slots[content_hash] = slot
+        _LOGGER.debug("Restored %d program slots", len(self._slots))
+
+    async def async_remove(self) -> None:
+        """Delete the persisted table."""
+        await self._store.async_remove()
+
+    def lookup(self, content_hash: str) -> Optional[int]:
+        """Return the slot holding content_hash and mark it recently used."""
+        slot = self._slots.get(content_hash)
+        if slot is not None:
+            self._slots.move_to_end(content_hash)
+            self._schedule_save()
+        return slot
+
+    def allocate(self) -> int:
+        """Reserve a slot to upload into, evicting the LRU entry if needed.
+
+        The slot is not associated with any content until commit() is
+        called, so a failed upload never leaves a stale mapping behind.
+        """
+        used = set(self._slots.values()) | set(self._pending)
+        for slot in range(self._size):
+            if slot not in used:
+                self._pending[slot] = None
+                return slot
+        if not self._slots:
+            raise HomeAssistantError("All program slots are being uploaded")
+        evicted_hash, slot = self._slots.popitem(last=False)
+        _LOGGER.debug("Evicting program slot %d (%s)", slot, evicted_hash)
+        self._pending[slot] = evicted_hash
+        self._schedule_save()
+        return slot
+
+    def commit(self, content_hash: str, slot: int) -> None:
+        """Record that content_hash has been stored in slot."""
+        self._pending.pop(slot, None)
+        for stale in [h for h, s in self._slots.items() if s == slot]:
+            del self._slots[stale]
+        self._slots.pop(content_hash, None)
+        self._slots[content_hash] = slot
+        self._schedule_save()
+
+    def rollback(self, slot: int) -> None:
+        """Release a reserved slot whose upload failed or was superseded.
+
+        The device only replaces a program once the whole frame has arrived,
+        so the entry evicted for the slot is still there and is put back.
+        """
+        if slot not in self._pending:
+            return
+        evicted_hash = self._pending.pop(slot)
+        if evicted_hash is not None and evicted_hash not in self._slots:
+            self._slots[evicted_hash] = slot
+            self._slots.move_to_end(evicted_hash, last=False)
+            self._schedule_save()
+
+    def _schedule_save(self) -> None:
+        self._store.async_delay_save(self._data_to_save, SAVE_DELAY)
+
+    def _data_to_save(self) -> dict[str, Any]:
+        return {"slots": list(self._slots.items())}
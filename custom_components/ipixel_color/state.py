@@ -0,0 +1,27 @@
+"""Panel state records used to resync iPixel Color displays after outages."""
+from __future__ import annotations
+
+from dataclasses import dataclass, fields
+from typing import Optional
+
+
+@dataclass
+class PanelState:
+    """Power, light settings, mode and content of a panel."""
+
+    is_on: bool = False
+    brightness: int = 255
+    rgb_color: tuple[int, int, int] = (255, 255, 255)
+    effect: str = "static"
+    display_mode: str = "off"
+    # Identifies the text/image/animation on screen; None for live content
+    # (playlists, streams, layouts, drawings), which is never replayed.
+    content_hash: Optional[str] = None
+
+    def diff(self, other: PanelState) -> set[str]:
+        """Return the names of the fields that differ from other."""
+        return {
+            f.name
+            for f in fields(self)
+            if getattr(self, f.name) != getattr(other, f.name)
+        }
@@ -0,0 +1,166 @@
+"""Live frame streaming from camera/image entities to iPixel Color displays."""
+from __future__ import annotations
+
+import asyncio
+import io
+import logging
+import time
+from collections import deque
+from typing import TYPE_CHECKING, Optional
+
+from PIL import Image
+
+from homeassistant.components.camera import async_get_image
+from homeassistant.core import split_entity_id
+from homeassistant.exceptions import HomeAssistantError
+
+from .profiling import STAGE_ENCODE
+
+if TYPE_CHECKING:
+    from .coordinator import IPixelColorDataUpdateCoordinator
+
+_LOGGER = logging.getLogger(__name__)
+
+# Window used to compute the achieved frame rate
+FPS_WINDOW = 5.0
+
+
+def downscale_frame(raw: bytes, width: int, height: int) -> bytes:
+    """Decode an image and return it as width x height RGB888 (blocking)."""
+    with Image.open(io.BytesIO(raw)) as img:
+        img = img.convert("RGB").resize((width, height), Image.Resampling.BILINEAR)
+        return img.tobytes()
+
+
+class IPixelColorFrameStream:
+    """Mirror a camera or image entity onto the panel.
+
+    Frames are fetched at the requested rate and kept in a single-slot
+    buffer: if the link is slower than the source, the newest frame replaces
+    the one still waiting, so stale frames are dropped instead of queued.
+    """
+
+    def __init__(
+        self,
+        coordinator: IPixelColorDataUpdateCoordinator,
+        source_entity_id: str,
+        fps: float,
+        width: int,
+        height: int,
+    ) -> None:
+        """Initialize the stream."""
+        self._coordinator = coordinator
+        self.source_entity_id = source_entity_id
+        self._interval = 1.0 / fps
+        self._width = width
+        self._height = height
+
+        self._latest: Optional[bytes] = None
+        self._frame_ready = asyncio.Event()
+        self._tasks: list[asyncio.Task] = []
+        self._sent: deque[float] = deque()
+        self.dropped_frames = 0
+        self.fps = 0.0
+
+    def start(self) -> None:
+        """Start fetching and sending frames in the background."""
+        hass = self._coordinator.hass
+        name = f"ipixel_color stream {self._coordinator.device_address}"
+        self._tasks = [
+            hass.async_create_background_task(self._async_produce(), f"{name} fetch"),
+            hass.async_create_background_task(self._async_consume(), f"{name} send"),
+            hass.async_create_background_task(self._async_report(), f"{name} fps"),
+        ]
+
+    async def async_stop(self) -> None:
+        """Stop both loops and wait for them to finish."""
+        for task in self._tasks:
+            task.cancel()
+        for task in self._tasks:
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        self._tasks = []
+        self.fps = 0.0
+
+    async def _async_fetch(self) -> bytes:
+        hass = self._coordinator.hass
+        domain = split_entity_id(self.source_entity_id)[0]
+        if domain == "camera":
+            image = await async_get_image(
+                hass, self.source_entity_id, width=self._width, height=self._height
+            )
+            return image.content
+
+        component = hass.data.get(domain)
+        entity = component.get_entity(self.source_entity_id) if component else None
+        if entity is None:
+            raise HomeAssistantError(f"Image entity {self.source_entity_id} not found")
+        content = await entity.async_image()
+        if content is None:
+            raise HomeAssistantError(f"Image entity {self.source_entity_id} has no image")
+        return content
+
+    async def _async_produce(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            started = loop.time()
+            try:
+                raw = await self._async_fetch()
+                with self._coordinator.profiler.span(STAGE_ENCODE):
+                    frame = await self._coordinator.hass.async_add_executor_job(
+                        downscale_frame, raw, self._width, self._height
+                    )
+            except HomeAssistantError as err:
+                _LOGGER.debug("Stream fetch from %s failed: %s", self.source_entity_id, err)
+            except Exception as err:  # undecodable image etc.
+                _LOGGER.warning("Stream frame from %s dropped: %s", self.source_entity_id, err)
+            else:
+                if self._latest is not None:
+                    self.dropped_frames += 1
+                self._latest = frame
+                self._frame_ready.set()
+
+            await asyncio.sleep(max(0.0, self._interval - (loop.time() - started)))
+
+    async def _async_consume(self) -> None:
+        # Frames keep coming; never disconnect another panel for one.
+        with self._coordinator.background():
+            await self._async_send_frames()
+
+    async def _async_send_frames(self) -> None:
+        while True:
+            await self._frame_ready.wait()
+            self._frame_ready.clear()
+            frame, self._latest = self._latest, None
+            if frame is None:
+                continue
+            try:
+                # Own channel: a frame only replaces the previous frame,
+                # never a content upload.
+                sent = await self._coordinator.async_send_frame(
+                    frame, self._width, self._height, channel="stream"
+                )
+            except Exception as err:
+                _LOGGER.debug("Stream frame send failed: %s", err)
+                await asyncio.sleep(1)
+                continue
+            if sent:
+                self._record_sent()
+
+    def _record_sent(self) -> None:
+        self._sent.append(time.monotonic())
+
+    async def _async_report(self) -> None:
+        # Recomputed on a timer rather than per send, so a stalled source or
+        # a failing link brings the reported rate down to 0.
+        while True:
+            await asyncio.sleep(FPS_WINDOW)
+            now = time.monotonic()
+            while self._sent and now - self._sent[0] > FPS_WINDOW:
+                self._sent.popleft()
+            fps = round(len(self._sent) / FPS_WINDOW, 2)
+            if fps != self.fps:
+                self.fps = fps
+                self._coordinator.async_report_stream_fps(fps)
@@ -0,0 +1,42 @@
+"""Fixtures driving the coordinator against the emulated panel."""
+from __future__ import annotations
+
+from types import SimpleNamespace
+
+import pytest
+import pytest_asyncio
+
+from homeassistant.core import HomeAssistant
+
+from custom_components.ipixel_color.coordinator import IPixelColorDataUpdateCoordinator
+
+from .emulator import EmulatedIPixelDevice
+
+
+@pytest_asyncio.fixture
+async def hass(tmp_path):
+    """Return a bare Home Assistant instance."""
+    hass = HomeAssistant(str(tmp_path))
+    yield hass
+    await hass.async_stop(force=True)
+
+
+@pytest.fixture
+def device() -> EmulatedIPixelDevice:
+    """Return an emulated panel with a 100 byte MTU."""
+    return EmulatedIPixelDevice(mtu=100)
+
+
+@pytest_asyncio.fixture
+async def coordinator(hass, device):
+    """Return a coordinator wired to the emulated panel."""
+    entry = SimpleNamespace(
+        entry_id="test",
+        data={"device_address": "AA:BB:CC:DD:EE:FF"},
+        options={},
+    )
+    coordinator = IPixelColorDataUpdateCoordinator(
+        hass, entry, client_factory=device.client_factory
+    )
+    yield coordinator
+    await coordinator.async_shutdown()
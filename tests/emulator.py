@@ -0,0 +1,344 @@
+"""In-process emulation of an iPixel Color GATT peripheral.
+
+Pass ``EmulatedIPixelDevice.client_factory`` as the coordinator's
+``client_factory`` to drive the real send path without hardware. The
+emulator reassembles chunked writes, validates CRC32 trailers, keeps a model
+of the panel state and answers every frame with a notify ACK. Failure knobs
+cover slow writes, dropped connections and MTU renegotiation.
+"""
+from __future__ import annotations
+
+import asyncio
+import binascii
+import logging
+from dataclasses import dataclass, field
+from typing import Any, Callable, Optional
+
+from bleak import BleakError
+
+from custom_components.ipixel_color.const import (
+    CHARACTERISTIC_NOTIFY,
+    CHARACTERISTIC_WRITE,
+    SERVICE_UUID,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+ACK_HEADER = 0xAA
+STATUS_HEADER = 0xAB
+
+# Mirrors coordinator.CMD_MAPPING
+CMD_TURN_ON = 0x01
+CMD_TURN_OFF = 0x02
+CMD_STORE_PROGRAM = 0x07
+CMD_SELECT_PROGRAM = 0x08
+CMD_SET_BRIGHTNESS = 0x09
+CMD_SET_COLOR = 0x0A
+CMD_ABORT_TRANSFER = 0x0D
+
+ATT_HEADER = 3
+DEFAULT_MTU = 247
+
+
+def _crc32(data: bytes, value: int = 0) -> int:
+    return binascii.crc32(data, value) & 0xFFFFFFFF
+
+
+def _split_frames(data: bytes) -> tuple[list[bytes], int]:
+    """Split data into complete frames; return them and the bytes consumed."""
+    frames = []
+    start = 0
+    crc = 0
+    end = start + 5
+    while end <= len(data):
+        crc = _crc32(data[end - 5 : end - 4], crc)
+        if data[end - 4 : end] == crc.to_bytes(4, "little"):
+            frames.append(bytes(data[start : end - 4]))
+            start = end
+            crc = 0
+            end = start + 5
+        else:
+            end += 1
+    return frames, start
+
+
+@dataclass
+class EmulatedCharacteristic:
+    """Subset of BleakGATTCharacteristic used by the coordinator."""
+
+    uuid: str
+    properties: list[str]
+    max_write_without_response_size: int = 20
+
+
+@dataclass
+class EmulatedService:
+    """Subset of BleakGATTService used by the coordinator."""
+
+    uuid: str
+    characteristics: list[EmulatedCharacteristic] = field(default_factory=list)
+
+
+class EmulatedIPixelDevice:
+    """Panel state shared by every connection made to it."""
+
+    def __init__(
+        self,
+        mtu: int = DEFAULT_MTU,
+        mtu_delay: float = 0.0,
+        write_delay: float = 0.0,
+        connect_delay: float = 0.0,
+    ) -> None:
+        """Initialize the emulated panel.
+
+        mtu_delay is how long the link reports the 20 byte default before
+        the negotiated size shows up, as some backends do.
+        """
+        self.mtu = mtu
+        self.mtu_delay = mtu_delay
+        self.write_delay = write_delay
+        self.connect_delay = connect_delay
+        self.fail_connect = False
+        self.drop_after_writes: Optional[int] = None
+
+        # Observed traffic
+        self.writes: list[bytes] = []
+        self.frames: list[bytes] = []
+        self.connections = 0
+        self.discarded_bytes = 0
+
+        # Panel model
+        self.is_on = False
+        self.brightness = 255
+        self.rgb_color = (255, 255, 255)
+        self.programs: dict[int, bytes] = {}
+        self.selected_program: Optional[int] = None
+
+        self._client: Optional[EmulatedBleakClient] = None
+        self._buffer = bytearray()
+        self._crc = 0
+        self._crc_len = 0
+
+    def client_factory(self, address: str, **kwargs: Any) -> EmulatedBleakClient:
+        """Create a BleakClient stand-in bound to this panel."""
+        return EmulatedBleakClient(self, address, **kwargs)
+
+    @property
+    def commands(self) -> list[int]:
+        """Return the command id of every frame received so far."""
+        return [frame[0] for frame in self.frames]
+
+    # Failure injection
+
+    def drop_connection(self) -> None:
+        """Drop the link as if the panel went out of range."""
+        if self._client is not None:
+            self._client._async_drop()
+
+    def renegotiate_mtu(self, mtu: int) -> None:
+        """Change the MTU of the live link (and of future links)."""
+        self.mtu = mtu
+        if self._client is not None:
+            self._client.write_char.max_write_without_response_size = mtu - ATT_HEADER
+
+    async def async_notify_status(self) -> None:
+        """Push an unsolicited status frame to the connected client."""
+        if self._client is not None:
+            await self._client._async_notify(
+                bytes([STATUS_HEADER, int(self.is_on), self.brightness, *self.rgb_color])
+            )
+
+    # Link side
+
+    def _attach(self, client: EmulatedBleakClient) -> None:
+        if self._client is not None and self._client is not client:
+            self._client._async_drop()
+        self._client = client
+        self.connections += 1
+        self._reset_buffer()
+
+    def _detach(self, client: EmulatedBleakClient) -> None:
+        if self._client is client:
+            self._client = None
+            self._reset_buffer()
+
+    def _reset_buffer(self) -> None:
+        self.discarded_bytes += len(self._buffer)
+        self._buffer.clear()
+        self._crc = 0
+        self._crc_len = 0
+
+    def _receive(self, data: bytes) -> list[bytes]:
+        """Feed one GATT write and return the frames it completed."""
+        self.writes.append(bytes(data))
+
+        # A write that is a whole frame on its own (a control frame cutting
+        # in between the chunks of a bulk transfer) is handled out of band,
+        # leaving the partially received bulk frame untouched.
+        if self._buffer:
+            frames, consumed = _split_frames(data)
+            if frames and consumed == len(data):
+                for frame in frames:
+                    if frame[0] == CMD_ABORT_TRANSFER:
+                        self._reset_buffer()
+                    self._apply(frame)
+                return frames
+
+        self._buffer.extend(data)
+
+        # Frames carry no length field: a frame ends where the last four
+        # bytes are the CRC32 of everything before them. The running CRC
+        # keeps the scan linear in the buffer size.
+        completed = []
+        end = self._crc_len + 5
+        while end <= len(self._buffer):
+            body_len = end - 4
+            self._crc = _crc32(self._buffer[self._crc_len:body_len], self._crc)
+            self._crc_len = body_len
+            if self._buffer[body_len:end] == self._crc.to_bytes(4, "little"):
+                frame = bytes(self._buffer[:body_len])
+                del self._buffer[:end]
+                self._crc = 0
+                self._crc_len = 0
+                self._apply(frame)
+                completed.append(frame)
+                end = 5
+            else:
+                end += 1
+        return completed
+
+    def _apply(self, frame: bytes) -> None:
+        self.frames.append(frame)
+        cmd = frame[0]
+        if cmd == CMD_TURN_ON:
+            self.is_on = True
+        elif cmd == CMD_TURN_OFF:
+            self.is_on = False
+        elif cmd == CMD_SET_BRIGHTNESS:
+            self.brightness = frame[1]
+        elif cmd == CMD_SET_COLOR:
+            self.rgb_color = tuple(frame[1:4])
+        elif cmd == CMD_STORE_PROGRAM:
+            self.programs[frame[1]] = frame[2:]
+        elif cmd == CMD_SELECT_PROGRAM:
+            self.selected_program = frame[1]
+
+
+class EmulatedBleakClient:
+    """Drop-in for the parts of BleakClient the coordinator uses."""
+
+    def __init__(
+        self,
+        device: EmulatedIPixelDevice,
+        address: str,
+        disconnected_callback: Optional[Callable[[Any], None]] = None,
+        **kwargs: Any,
+    ) -> None:
+        """Initialize the client."""
+        self.address = address
+        self._device = device
+        self._disconnected_callback = disconnected_callback
+        self._connected = False
+        self._notify_callbacks: dict[str, Callable[..., Any]] = {}
+        self.write_char = EmulatedCharacteristic(
+            CHARACTERISTIC_WRITE, ["write", "write_without_response"]
+        )
+        self.notify_char = EmulatedCharacteristic(CHARACTERISTIC_NOTIFY, ["notify"])
+        self._mtu_handle: Optional[asyncio.TimerHandle] = None
+
+    @property
+    def is_connected(self) -> bool:
+        """Return True while the link is up."""
+        return self._connected
+
+    async def connect(self, **kwargs: Any) -> bool:
+        """Open the link."""
+        if self._device.connect_delay:
+            await asyncio.sleep(self._device.connect_delay)
+        if self._device.fail_connect:
+            raise BleakError(f"Device {self.address} not found")
+
+        self._connected = True
+        self._device._attach(self)
+
+        negotiated = self._device.mtu - ATT_HEADER
+        if self._device.mtu_delay:
+            self.write_char.max_write_without_response_size = 20
+            self._mtu_handle = asyncio.get_running_loop().call_later(
+                self._device.mtu_delay, self._set_max_write, negotiated
+            )
+        else:
+            self._set_max_write(negotiated)
+        return True
+
+    def _set_max_write(self, size: int) -> None:
+        self.write_char.max_write_without_response_size = size
+
+    async def disconnect(self) -> bool:
+        """Close the link."""
+        self._teardown()
+        return True
+
+    async def get_services(self) -> list[EmulatedService]:
+        """Return the emulated GATT table."""
+        self._ensure_connected()
+        return [EmulatedService(SERVICE_UUID, [self.write_char, self.notify_char])]
+
+    async def start_notify(self, char: EmulatedCharacteristic, callback: Callable[..., Any]) -> None:
+        """Register a notify callback."""
+        self._ensure_connected()
+        self._notify_callbacks[char.uuid] = callback
+
+    async def stop_notify(self, char: EmulatedCharacteristic) -> None:
+        """Unregister a notify callback."""
+        self._notify_callbacks.pop(char.uuid, None)
+
+    async def write_gatt_char(
+        self, char: EmulatedCharacteristic, data: bytes, response: bool = False
+    ) -> None:
+        """Deliver one write to the panel."""
+        self._ensure_connected()
+        if not response and len(data) > char.max_write_without_response_size:
+            raise BleakError(
+                f"Write of {len(data)} bytes exceeds MTU "
+                f"({char.max_write_without_response_size})"
+            )
+        if self._device.write_delay:
+            await asyncio.sleep(self._device.write_delay)
+            self._ensure_connected()
+
+        for frame in self._device._receive(data):
+            await self._async_notify(bytes([ACK_HEADER, frame[0], 0x00]))
+
+        if self._device.drop_after_writes is not None:
+            self._device.drop_after_writes -= 1
+            if self._device.drop_after_writes <= 0:
+                self._device.drop_after_writes = None
+                self._async_drop()
+
+    async def _async_notify(self, data: bytes) -> None:
+        callback = self._notify_callbacks.get(self.notify_char.uuid)
+        if callback is None:
+            return
+        result = callback(self.notify_char, bytearray(data))
+        if asyncio.iscoroutine(result):
+            await result
+
+    def _ensure_connected(self) -> None:
+        if not self._connected:
+            raise BleakError("Not connected")
+
+    def _async_drop(self) -> None:
+        if not self._connected:
+            return
+        self._teardown()
+        if self._disconnected_callback is not None:
+            self._disconnected_callback(self)
+
+    def _teardown(self) -> None:
+        self._connected = False
+        self._notify_callbacks.clear()
+        if self._mtu_handle is not None:
+            self._mtu_handle.cancel()
+            self._mtu_handle = None
+        self._device._detach(self)
@@ -0,0 +1,45 @@
+"""DIY drawing tests."""
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from custom_components.ipixel_color import framebuffer
+
+pytestmark = pytest.mark.asyncio
+
+async def _wait_for(condition, timeout: float = 2.0) -> None:
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    while not condition() and loop.time() < deadline:
+        await asyncio.sleep(0.01)
+
+
+async def test_overlapping_first_draws_share_a_framebuffer(coordinator, device):
+    """Two first draws in flight together draw into the same framebuffer."""
+    await asyncio.gather(
+        coordinator.async_draw([{"op": "pixel", "x": 0, "y": 0}]),
+        coordinator.async_draw([{"op": "pixel", "x": 2, "y": 0}]),
+    )
+
+    pixels = coordinator._framebuffer.pixels
+    assert pixels[0, 0].tolist() == [255, 255, 255]
+    assert pixels[0, 2].tolist() == [255, 255, 255]
+
+
+async def test_failed_flush_is_retried(coordinator, device, monkeypatch):
+    """A flush that failed is retried without further drawing."""
+    monkeypatch.setattr(framebuffer, "RETRY_DELAY", 0.05)
+    await coordinator.async_draw([{"op": "clear"}])
+    await _wait_for(lambda: device.frames)
+    device.fail_connect = True
+    device.drop_connection()
+
+    await coordinator.async_draw([{"op": "pixel", "x": 1, "y": 1}])
+    await asyncio.sleep(0.2)
+    device.frames.clear()
+    device.fail_connect = False
+    await _wait_for(lambda: device.frames)
+
+    assert device.commands
@@ -0,0 +1,45 @@
+"""Layout validation tests."""
+from __future__ import annotations
+
+import pytest
+import voluptuous as vol
+
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers.template import Template
+
+from custom_components.ipixel_color import LAYOUT_REGION_SCHEMA, _unique_region_names
+from custom_components.ipixel_color.layout import LayoutRegion
+
+pytestmark = pytest.mark.asyncio
+
+
+def _region(name: str, **extra) -> dict:
+    return {"name": name, "template": "x", "width": 8, "height": 8, **extra}
+
+
+async def test_region_color_needs_three_values():
+    """A region color is exactly one RGB triple."""
+    assert LAYOUT_REGION_SCHEMA(_region("a", color=[1, 2, 3]))["color"] == [1, 2, 3]
+    for color in ([1, 2], [1, 2, 3, 4]):
+        with pytest.raises(vol.Invalid):
+            LAYOUT_REGION_SCHEMA(_region("a", color=color))
+
+
+async def test_duplicate_region_names_rejected():
+    """Two regions cannot share a name."""
+    with pytest.raises(vol.Invalid, match="time"):
+        _unique_region_names([_region("time"), _region("temp"), _region("time")])
+
+
+async def test_region_outside_display_rejected(coordinator, device):
+    """A region reaching past the display edge is refused."""
+    hass = coordinator.hass
+    fits = LayoutRegion("fits", Template("a", hass), 24, 24, 8, 8)
+    overflows = LayoutRegion("wide", Template("b", hass), 24, 0, 16, 8)
+
+    with pytest.raises(HomeAssistantError, match="wide"):
+        await coordinator.async_start_layout([fits, overflows], min_interval=1)
+    assert coordinator._layout is None
+
+    await coordinator.async_start_layout([fits], min_interval=1)
+    assert coordinator._layout is not None
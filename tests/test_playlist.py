@@ -0,0 +1,51 @@
+"""Playlist rotation tests."""
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from custom_components.ipixel_color import playlist
+from custom_components.ipixel_color.const import DISPLAY_MODE_IMAGE, DISPLAY_MODE_TEXT
+from custom_components.ipixel_color.playlist import PlaylistItem
+
+from .emulator import CMD_SELECT_PROGRAM
+
+pytestmark = pytest.mark.asyncio
+
+
+async def test_rotation_survives_outage(coordinator, device, monkeypatch):
+    """A panel outage pauses a repeating playlist instead of ending it."""
+    monkeypatch.setattr(playlist, "RETRY_MIN", 0.01)
+    await coordinator.async_refresh()
+    device.fail_connect = True
+    device.drop_connection()
+
+    await coordinator.async_start_playlist(
+        [
+            PlaylistItem(DISPLAY_MODE_TEXT, "one", dwell=0.05),
+            PlaylistItem(DISPLAY_MODE_TEXT, "two", dwell=0.05),
+        ]
+    )
+    await asyncio.sleep(0.2)
+    assert coordinator._playlist.running
+
+    device.fail_connect = False
+    await asyncio.sleep(0.5)
+
+    assert coordinator._playlist.running
+    assert device.commands.count(CMD_SELECT_PROGRAM) >= 2
+
+
+async def test_unpreparable_items_are_skipped(coordinator, device):
+    """An item that can never be prepared does not stop the rotation."""
+    await coordinator.async_start_playlist(
+        [
+            PlaylistItem(DISPLAY_MODE_IMAGE, "/nonexistent.png", dwell=0.05),
+            PlaylistItem(DISPLAY_MODE_TEXT, "ok", dwell=0.05),
+        ]
+    )
+    await asyncio.sleep(0.3)
+
+    assert coordinator._playlist.running
+    assert CMD_SELECT_PROGRAM in device.commands
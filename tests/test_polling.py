@@ -0,0 +1,95 @@
+"""Health poll tests."""
+from __future__ import annotations
+
+import asyncio
+import os
+
+import pytest
+
+from custom_components.ipixel_color.const import (
+    DEFAULT_UPDATE_INTERVAL,
+    IDLE_POLL_AFTER,
+    MIN_POLL_INTERVAL,
+)
+from custom_components.ipixel_color.sensor import IPixelColorStatusSensor
+
+pytestmark = pytest.mark.asyncio
+
+
+def _interval(coordinator) -> float:
+    return coordinator.update_interval.total_seconds()
+
+
+async def test_idle_panel_polled_less(coordinator, device):
+    """A panel without recent activity is polled four times less often."""
+    coordinator.last_activity = coordinator.hass.loop.time() - IDLE_POLL_AFTER - 1
+
+    await coordinator.async_refresh()
+
+    assert _interval(coordinator) == DEFAULT_UPDATE_INTERVAL * 4
+
+
+async def test_notifying_panel_polled_less(coordinator, device):
+    """Recent notifications show the link is alive; polls are halved."""
+    await coordinator.async_turn_on()
+    await device.async_notify_status()
+
+    await coordinator.async_refresh()
+
+    assert _interval(coordinator) == DEFAULT_UPDATE_INTERVAL * 2
+
+
+async def test_failures_poll_more_often(coordinator, device):
+    """Each failed poll halves the interval, down to the minimum."""
+    await coordinator.async_turn_on()
+    device.fail_connect = True
+    device.drop_connection()
+
+    intervals = []
+    for _ in range(3):
+        await coordinator.async_refresh()
+        intervals.append(_interval(coordinator))
+
+    assert intervals == [
+        DEFAULT_UPDATE_INTERVAL / 2,
+        DEFAULT_UPDATE_INTERVAL / 4,
+        MIN_POLL_INTERVAL,
+    ]
+
+    device.fail_connect = False
+    await coordinator.async_refresh()
+    assert _interval(coordinator) >= DEFAULT_UPDATE_INTERVAL
+
+
+async def test_poll_during_transfer_reports_commands(coordinator, device, tmp_path):
+    """A poll skipped for a transfer still publishes commands sent meanwhile."""
+    await coordinator.async_refresh()
+    path = tmp_path / "a.bin"
+    path.write_bytes(os.urandom(5000))
+    device.write_delay = 0.002
+    writes = len(device.writes)
+
+    upload = asyncio.ensure_future(coordinator.async_display_image(str(path)))
+    while len(device.writes) < writes + 3:
+        await asyncio.sleep(0.001)
+    await coordinator.async_turn_on(brightness=10)
+    await coordinator.async_refresh()
+    assert not upload.done()
+    await upload
+
+    assert device.is_on is True
+    assert coordinator.data["is_on"] is True
+    assert coordinator.data["brightness"] == 10
+    assert coordinator.data["connection_status"] == "connected"
+
+
+async def test_poll_interval_attribute(coordinator, device):
+    """The status sensor shows the interval in effect."""
+    coordinator.last_activity = coordinator.hass.loop.time() - IDLE_POLL_AFTER - 1
+    await coordinator.async_refresh()
+    sensor = IPixelColorStatusSensor(coordinator, coordinator.entry)
+
+    assert sensor.native_value == "connected"
+    assert sensor.extra_state_attributes == {
+        "poll_interval": DEFAULT_UPDATE_INTERVAL * 4
+    }
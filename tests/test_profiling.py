@@ -0,0 +1,72 @@
+"""Stage profiler tests."""
+from __future__ import annotations
+
+import pytest
+
+from custom_components.ipixel_color.profiling import (
+    STAGE_CRC,
+    STAGE_ENCODE,
+    STAGE_SEND,
+    StageProfiler,
+)
+
+pytestmark = pytest.mark.asyncio
+
+
+async def test_span_is_noop_while_inactive():
+    """Nothing is recorded outside a capture."""
+    profiler = StageProfiler()
+    first = profiler.span(STAGE_ENCODE)
+
+    with first:
+        pass
+    profiler.record(STAGE_CRC, 1.0)
+
+    assert profiler.span(STAGE_SEND) is first
+    profiler.start()
+    assert profiler.stop() == {}
+
+
+async def test_summary_counts_and_percentiles():
+    """stop() reports count, total and nearest-rank percentiles in ms."""
+    profiler = StageProfiler()
+    profiler.start()
+    for ms in range(1, 101):
+        profiler.record(STAGE_SEND, ms / 1000)
+
+    summary = profiler.stop()
+
+    assert summary == {
+        STAGE_SEND: {
+            "count": 100,
+            "total_ms": 5050.0,
+            "p50_ms": 50.0,
+            "p90_ms": 90.0,
+            "p99_ms": 99.0,
+            "max_ms": 100.0,
+        }
+    }
+
+
+async def test_samples_cleared_after_stop():
+    """A capture starts from scratch; stop() forgets the samples."""
+    profiler = StageProfiler()
+    profiler.start()
+    with profiler.span(STAGE_ENCODE):
+        pass
+    assert profiler.stop()[STAGE_ENCODE]["count"] == 1
+
+    assert profiler.stop() == {}
+    profiler.start()
+    assert profiler.stop() == {}
+
+
+async def test_text_payload_times_crc_separately(coordinator):
+    """Building a text frame reports its encode and CRC stages apart."""
+    coordinator.profiler.start()
+    coordinator._build_text_payload("profiled")
+
+    stages = coordinator.profiler.stop()
+
+    assert stages[STAGE_ENCODE]["count"] == 1
+    assert stages[STAGE_CRC]["count"] == 1
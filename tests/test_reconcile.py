@@ -0,0 +1,114 @@
+"""Desired-state reconciliation tests."""
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers.template import Template
+
+from custom_components.ipixel_color.const import MAX_IMAGE_BYTES
+from custom_components.ipixel_color.layout import LayoutRegion
+
+from .emulator import CMD_SELECT_PROGRAM
+
+CMD_DISPLAY_FRAME = 0x0C
+CMD_DRAW_REGION = 0x0E
+
+pytestmark = pytest.mark.asyncio
+
+
+async def _wait_for(condition, timeout: float = 2.0) -> None:
+    """Wait until condition() holds; timers and uploads run meanwhile."""
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    while not condition() and loop.time() < deadline:
+        await asyncio.sleep(0.01)
+
+
+async def _go_offline(coordinator, device) -> None:
+    await coordinator.async_refresh()
+    device.fail_connect = True
+    device.drop_connection()
+
+
+async def test_reconnect_from_inside_a_batch(coordinator, device):
+    """Content restored by a reconnect made inside a batch is really sent."""
+    await _go_offline(coordinator, device)
+    await coordinator.async_display_text("while away")
+    device.fail_connect = False
+
+    async with coordinator.async_batch():
+        await coordinator.async_turn_on(brightness=20)
+        # As a refresh triggered from inside the batch would
+        await coordinator.async_refresh()
+    await coordinator.hass.async_block_till_done()
+
+    shown = coordinator._build_text_payload("while away")
+    assert device.commands[-1] == CMD_SELECT_PROGRAM
+    assert device.programs[device.selected_program] == bytes(shown)
+    assert device.brightness == 20
+    assert not coordinator.desired.diff(coordinator._applied)
+
+
+async def test_static_layout_redrawn_after_outage(coordinator, device):
+    """A layout whose update was lost offline is sent once the panel is back."""
+    await _go_offline(coordinator, device)
+    region = LayoutRegion("static", Template("hello", coordinator.hass), 0, 0, 8, 8)
+    await coordinator.async_start_layout([region], min_interval=0.1)
+    await coordinator.hass.async_block_till_done()
+    assert CMD_DRAW_REGION not in device.commands
+
+    device.fail_connect = False
+    await coordinator.async_refresh()
+    await _wait_for(lambda: CMD_DRAW_REGION in device.commands)
+
+    assert CMD_DRAW_REGION in device.commands
+
+
+async def test_drawing_redrawn_after_outage(coordinator, device):
+    """A drawing whose flush failed offline is sent once the panel is back."""
+    await coordinator.async_draw([{"op": "clear"}])
+    await asyncio.sleep(0.2)
+    device.fail_connect = True
+    device.drop_connection()
+
+    await coordinator.async_draw([{"op": "pixel", "x": 1, "y": 1}])
+    await asyncio.sleep(0.2)
+    device.frames.clear()
+
+    device.fail_connect = False
+    await coordinator.async_refresh()
+    await _wait_for(lambda: device.frames)
+
+    assert device.commands == [CMD_DISPLAY_FRAME]
+
+
+async def test_unshowable_image_keeps_desired_content(coordinator, device, tmp_path):
+    """A missing or oversize image leaves the previous content to restore."""
+    await coordinator.async_display_text("kept")
+    desired = coordinator.desired.content_hash
+    big = tmp_path / "big.bin"
+    big.write_bytes(bytes(MAX_IMAGE_BYTES + 1))
+
+    for path in (tmp_path / "missing.png", big):
+        with pytest.raises(HomeAssistantError):
+            await coordinator.async_display_image(str(path))
+        assert coordinator.desired.content_hash == desired
+
+
+async def test_failed_show_is_not_replayed(coordinator, device):
+    """Content whose show failed with the panel reachable is dropped."""
+    await coordinator.async_display_text("kept")
+    desired = coordinator.desired.content_hash
+    show = coordinator._show_content
+
+    async def fail() -> bool:
+        raise HomeAssistantError("broken")
+
+    with pytest.raises(HomeAssistantError):
+        await coordinator._async_show_content("broken", fail)
+
+    assert coordinator.desired.content_hash == desired
+    assert coordinator._show_content is show
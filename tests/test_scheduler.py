@@ -0,0 +1,105 @@
+"""Fleet scheduling tests."""
+from __future__ import annotations
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+import pytest_asyncio
+
+from custom_components.ipixel_color.coordinator import IPixelColorDataUpdateCoordinator
+from custom_components.ipixel_color.scheduler import FairSemaphore, IPixelColorScheduler
+
+from .emulator import CMD_TURN_OFF, EmulatedIPixelDevice
+
+pytestmark = pytest.mark.asyncio
+
+
+@pytest_asyncio.fixture
+async def panels(hass):
+    """Return two emulated panels sharing one single-connection adapter."""
+    scheduler = IPixelColorScheduler(hass, 1, 1, 4)
+    result = []
+    for index in range(2):
+        device = EmulatedIPixelDevice(mtu=100)
+        entry = SimpleNamespace(
+            entry_id=f"panel{index}",
+            data={"device_address": f"AA:BB:CC:DD:EE:0{index}"},
+            options={},
+        )
+        coordinator = IPixelColorDataUpdateCoordinator(
+            hass, entry, client_factory=device.client_factory, scheduler=scheduler
+        )
+        result.append((coordinator, device))
+    yield result
+    for coordinator, _ in result:
+        await coordinator.async_shutdown()
+
+
+async def test_poll_does_not_evict(panels):
+    """A health poll never disconnects another panel to get a slot."""
+    (first, first_device), (second, second_device) = panels
+    await first.async_refresh()
+
+    await second.async_refresh()
+
+    assert first.client.is_connected
+    assert second_device.connections == 0
+    assert second.last_update_success
+    assert second.data["connection_status"] == "unknown"
+
+
+async def test_command_evicts_idle_panel(panels):
+    """A command still gets a slot by disconnecting an idle panel."""
+    (first, first_device), (second, second_device) = panels
+    await first.async_refresh()
+
+    await second.async_turn_off()
+
+    assert not first.client.is_connected
+    assert second_device.commands[-1] == CMD_TURN_OFF
+
+
+async def test_background_send_does_not_evict(panels):
+    """Background work waits for a free slot instead of taking one."""
+    (first, first_device), (second, second_device) = panels
+    await first.async_refresh()
+
+    with second.background():
+        await second.async_turn_off()
+
+    assert first.client.is_connected
+    assert second_device.connections == 0
+    assert second.desired.is_on is False
+
+
+async def test_unreachable_panel_stops_evicting(panels):
+    """A panel that failed to connect no longer disconnects others."""
+    (first, first_device), (second, second_device) = panels
+    second_device.fail_connect = True
+    await first.async_refresh()
+    await second.async_turn_off()
+    await first.async_turn_on()
+    assert first.client.is_connected
+
+    for _ in range(3):
+        await second.async_turn_off()
+
+    assert first.client.is_connected
+    assert first_device.connections == 2
+
+
+async def test_cancelled_waiter_already_skipped():
+    """A waiter cancelled after release() passed it over leaves cleanly."""
+    slots = FairSemaphore(1)
+    await slots.acquire()
+    waiter = asyncio.ensure_future(slots.acquire())
+    await asyncio.sleep(0)
+
+    waiter.cancel()
+    # Runs before the waiter's except block, skipping its cancelled future
+    slots.release()
+
+    with pytest.raises(asyncio.CancelledError):
+        await waiter
+    await asyncio.wait_for(slots.acquire(), 1)
@@ -0,0 +1,57 @@
+"""Service handler tests."""
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers import entity_registry as er
+
+from custom_components.ipixel_color import async_setup
+from custom_components.ipixel_color.const import DOMAIN
+from custom_components.ipixel_color.profiling import STAGE_SEND
+
+pytestmark = pytest.mark.asyncio
+
+
+async def test_profile_without_panel_raises(hass):
+    """Profiling an unknown panel is an error, not an empty response."""
+    await er.async_load(hass)
+    await async_setup(hass, {})
+
+    with pytest.raises(HomeAssistantError, match="light.missing"):
+        await hass.services.async_call(
+            DOMAIN,
+            "profile",
+            {"entity_id": "light.missing", "duration": 1},
+            blocking=True,
+            return_response=True,
+        )
+
+
+async def test_profile_returns_and_fires_stages(hass, coordinator, device):
+    """profile returns the captured stages and fires them as an event."""
+    await er.async_load(hass)
+    await async_setup(hass, {})
+    hass.data[DOMAIN] = {"test": coordinator}
+    events = []
+    hass.bus.async_listen(f"{DOMAIN}_profile", events.append)
+
+    call = asyncio.ensure_future(
+        hass.services.async_call(
+            DOMAIN,
+            "profile",
+            {"entity_id": "light.panel", "duration": 1},
+            blocking=True,
+            return_response=True,
+        )
+    )
+    await asyncio.sleep(0.1)
+    await coordinator.async_turn_on()
+    response = await call
+    await hass.async_block_till_done()
+
+    assert response["device_address"] == coordinator.device_address
+    assert response["stages"][STAGE_SEND]["count"] >= 1
+    assert events[0].data["stages"] == response["stages"]
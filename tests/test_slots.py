@@ -0,0 +1,59 @@
+"""Program slot allocation tests."""
+from __future__ import annotations
+
+import asyncio
+import hashlib
+
+import pytest
+
+from custom_components.ipixel_color.slots import ProgramSlotTable
+
+
+
+def test_overlapping_allocations_get_distinct_slots(hass):
+    """A slot stays reserved until its upload is committed."""
+    table = ProgramSlotTable(hass, "test", 4)
+
+    first = table.allocate()
+    second = table.allocate()
+    assert first != second
+
+    table.commit("a", first)
+    table.commit("b", second)
+    assert table.lookup("a") == first
+    assert table.lookup("b") == second
+
+
+def test_rollback_restores_evicted_entry(hass):
+    """A failed upload puts back the entry evicted for it."""
+    table = ProgramSlotTable(hass, "test", 2)
+    for content_hash in ("a", "b"):
+        table.commit(content_hash, table.allocate())
+
+    slot = table.allocate()
+    assert table.lookup("a") is None
+
+    table.rollback(slot)
+    assert table.lookup("a") == slot
+    # Rolling back twice is harmless
+    table.rollback(slot)
+    assert table.lookup("a") == slot
+
+
+@pytest.mark.asyncio
+async def test_preload_and_display_uploads_overlap(coordinator, device):
+    """Concurrent uploads on different channels land in different slots."""
+    await coordinator.async_refresh()
+    device.write_delay = 0.001
+    payload = coordinator._build_text_payload("preloaded")
+
+    slot, _ = await asyncio.gather(
+        coordinator._async_store_program(payload, channel="preload"),
+        coordinator.async_display_text("shown now"),
+    )
+
+    shown = coordinator._build_text_payload("shown now")
+    assert device.selected_program != slot
+    assert device.programs[device.selected_program] == bytes(shown)
+    assert device.programs[slot] == bytes(payload)
+    assert coordinator.program_slots.lookup(hashlib.sha1(payload).hexdigest()) == slot
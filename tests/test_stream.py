@@ -0,0 +1,110 @@
+"""Frame stream tests."""
+from __future__ import annotations
+
+import asyncio
+import io
+
+import pytest
+from PIL import Image
+
+from custom_components.ipixel_color import stream
+from custom_components.ipixel_color.stream import IPixelColorFrameStream
+
+pytestmark = pytest.mark.asyncio
+
+
+def _png() -> bytes:
+    buffer = io.BytesIO()
+    Image.new("RGB", (4, 4), (255, 0, 0)).save(buffer, "PNG")
+    return buffer.getvalue()
+
+
+async def test_fps_drops_to_zero_when_frames_stop(coordinator, device, monkeypatch):
+    """The reported rate falls to 0 once no frame gets through any more."""
+    monkeypatch.setattr(stream, "FPS_WINDOW", 0.3)
+    frames = IPixelColorFrameStream(coordinator, "camera.test", 20, 4, 4)
+    online = True
+
+    async def fetch() -> bytes:
+        if not online:
+            raise stream.HomeAssistantError("camera unavailable")
+        return _png()
+
+    frames._async_fetch = fetch
+    frames.start()
+    try:
+        await asyncio.sleep(0.4)
+        assert frames.fps > 0
+
+        online = False
+        await asyncio.sleep(0.7)
+        assert frames.fps == 0
+    finally:
+        await frames.async_stop()
+
+
+async def test_stream_frames_do_not_supersede_uploads(coordinator, device):
+    """A frame sent during an upload leaves the upload alone."""
+    await coordinator.async_refresh()
+    payload = coordinator._build_text_payload("hello " * 30)
+    device.write_delay = 0.002
+    writes = len(device.writes)
+
+    upload = asyncio.ensure_future(coordinator._async_store_program(payload))
+    while len(device.writes) < writes + 3:
+        await asyncio.sleep(0.001)
+    await coordinator.async_send_frame(bytes(4 * 4 * 3), 4, 4, channel="stream")
+
+    slot = await upload
+    assert slot is not None
+    assert device.programs[slot] == bytes(payload)
+
+
+async def test_display_text_stops_stream(coordinator, device, monkeypatch):
+    """Showing text ends a running stream instead of racing it."""
+    async def fetch(self) -> bytes:
+        return _png()
+
+    monkeypatch.setattr(IPixelColorFrameStream, "_async_fetch", fetch)
+    await coordinator.async_start_stream("camera.test", 20)
+    while 0x0C not in device.commands:
+        await asyncio.sleep(0.01)
+
+    await coordinator.async_display_text("hello " * 30)
+
+    assert coordinator._stream is None
+    shown = coordinator._build_text_payload("hello " * 30)
+    assert device.programs[device.selected_program] == bytes(shown)
+
+
+async def test_slow_link_sends_latest_frame(coordinator, device, monkeypatch):
+    """Frames the link cannot keep up with are dropped; the newest is sent."""
+    shades = iter(range(10, 110, 10))
+    sent: list[int] = []
+
+    async def fetch() -> bytes:
+        try:
+            shade = next(shades)
+        except StopIteration:
+            raise stream.HomeAssistantError("no new frame") from None
+        buffer = io.BytesIO()
+        Image.new("RGB", (4, 4), (shade, 0, 0)).save(buffer, "PNG")
+        return buffer.getvalue()
+
+    async def send_frame(frame, width, height, channel="display") -> bool:
+        sent.append(frame[0])
+        await asyncio.sleep(0.1)
+        return True
+
+    monkeypatch.setattr(coordinator, "async_send_frame", send_frame)
+    frames = IPixelColorFrameStream(coordinator, "camera.test", 100, 4, 4)
+    frames._async_fetch = fetch
+    frames.start()
+    try:
+        await asyncio.sleep(0.5)
+    finally:
+        await frames.async_stop()
+
+    assert frames.dropped_frames > 0
+    assert len(sent) < 10
+    assert sent[-1] == 100
@@ -0,0 +1,61 @@
+"""display_text deduplication tests."""
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from .emulator import CMD_STORE_PROGRAM
+
+pytestmark = pytest.mark.asyncio
+
+
+async def test_superseded_text_is_not_a_duplicate(coordinator, device):
+    """Text whose upload was superseded is sent again when requested again."""
+    coordinator._text_min_interval = 0
+    device.mtu = 24
+    await coordinator.async_refresh()
+    device.write_delay = 0.01
+
+    text = asyncio.ensure_future(coordinator.async_display_text("x" * 200))
+    while len(device.writes) < 2:
+        await asyncio.sleep(0.001)
+    # A newer upload on the same channel cuts the text short.
+    other = coordinator._build_text_payload("other")
+    assert await coordinator._async_store_program(other) is not None
+    await text
+    assert device.selected_program is None
+
+    await coordinator.async_display_text("x" * 200)
+
+    shown = coordinator._build_text_payload("x" * 200)
+    assert device.programs[device.selected_program] == bytes(shown)
+
+
+async def test_repeated_text_is_dropped(coordinator, device):
+    """Text already on the panel is not sent again."""
+    coordinator._text_min_interval = 0
+    await coordinator.async_display_text("same")
+    writes = len(device.writes)
+
+    await coordinator.async_display_text("same")
+
+    assert len(device.writes) == writes
+
+
+async def test_rapid_changes_send_latest_once(coordinator, device):
+    """Values arriving within the interval end in one send of the latest."""
+    coordinator._text_min_interval = 0.2
+    await coordinator.async_display_text("first")
+    stored = device.commands.count(CMD_STORE_PROGRAM)
+
+    for value in ("1", "2", "3", "4"):
+        await coordinator.async_display_text(value)
+    assert device.commands.count(CMD_STORE_PROGRAM) == stored
+
+    await asyncio.sleep(0.4)
+    await coordinator.hass.async_block_till_done()
+
+    assert device.commands.count(CMD_STORE_PROGRAM) == stored + 1
+    shown = coordinator._build_text_payload("4")
+    assert device.programs[device.selected_program] == bytes(shown)
@@ -0,0 +1,196 @@
+"""Send path tests against the emulated panel."""
+from __future__ import annotations
+
+import asyncio
+import os
+
+import pytest
+
+from homeassistant.helpers.update_coordinator import UpdateFailed
+
+from .emulator import ATT_HEADER, CMD_STORE_PROGRAM, CMD_TURN_OFF, CMD_TURN_ON
+
+pytestmark = pytest.mark.asyncio
+
+
+def _write_image(tmp_path, name: str, size: int) -> tuple[str, bytes]:
+    data = os.urandom(size)
+    path = tmp_path / name
+    path.write_bytes(data)
+    return str(path), data
+
+
+def _stored_image(device, slot: int) -> bytes:
+    """Return the file bytes of the image stored in slot."""
+    # display_image command, file, inner CRC32
+    return device.programs[slot][1:-4]
+
+
+# Throughput across MTU changes
+
+
+async def test_upload_uses_full_size_chunks(coordinator, device, tmp_path):
+    """An upload is cut into as few writes as the MTU allows."""
+    path, data = _write_image(tmp_path, "a.bin", 3000)
+
+    await coordinator.async_display_image(path)
+
+    max_chunk = device.mtu - ATT_HEADER
+    frame_len = 2 + 1 + len(data) + 4 + 4
+    upload = [w for w in device.writes if len(w) > 20]
+    assert all(len(w) <= max_chunk for w in device.writes)
+    assert len(upload) >= frame_len // max_chunk
+    assert _stored_image(device, device.selected_program) == data
+
+
+async def test_upload_follows_mtu_renegotiation(coordinator, device, tmp_path):
+    """A smaller MTU fails the write in flight; the next upload adapts."""
+    first, _ = _write_image(tmp_path, "a.bin", 2000)
+    second, data = _write_image(tmp_path, "b.bin", 2000)
+    await coordinator.async_display_image(first)
+
+    device.renegotiate_mtu(50)
+    device.writes.clear()
+    await coordinator.async_display_image(second)
+
+    assert device.writes
+    assert all(len(w) <= 50 - ATT_HEADER for w in device.writes)
+    assert _stored_image(device, device.selected_program) == data
+
+    device.renegotiate_mtu(200)
+    await coordinator.async_release_connection()
+    device.writes.clear()
+    third, data = _write_image(tmp_path, "c.bin", 2000)
+    await coordinator.async_display_image(third)
+
+    assert max(len(w) for w in device.writes) == 200 - ATT_HEADER
+    assert _stored_image(device, device.selected_program) == data
+
+
+async def test_mtu_shrinking_mid_upload(coordinator, device, tmp_path):
+    """An upload cut short by a shrinking MTU can be retried right away."""
+    path, data = _write_image(tmp_path, "a.bin", 5000)
+    device.write_delay = 0.001
+    upload = asyncio.ensure_future(coordinator.async_display_image(path))
+    while len(device.writes) < 5:
+        await asyncio.sleep(0.001)
+    device.renegotiate_mtu(40)
+
+    with pytest.raises(UpdateFailed):
+        await upload
+    await coordinator.async_display_image(path)
+
+    assert _stored_image(device, device.selected_program) == data
+
+
+# Reconnect
+
+
+async def test_reconnect_after_drop(coordinator, device):
+    """A dropped link is re-established by the next command."""
+    await coordinator.async_refresh()
+    assert device.connections == 1
+
+    device.drop_connection()
+    assert not coordinator.client.is_connected
+
+    await coordinator.async_turn_off()
+
+    assert device.connections == 2
+    assert device.commands[-1] == CMD_TURN_OFF
+    assert device.is_on is False
+
+
+async def test_reconnect_after_failed_connects(coordinator, device):
+    """Polls fail while the panel is away and succeed once it is back."""
+    await coordinator.async_refresh()
+    device.fail_connect = True
+    device.drop_connection()
+
+    await coordinator.async_refresh()
+    assert not coordinator.last_update_success
+
+    device.fail_connect = False
+    await coordinator.async_refresh()
+
+    assert coordinator.last_update_success
+    assert coordinator.data["connection_status"] == "connected"
+    assert device.connections == 2
+
+
+async def test_offline_changes_restored_on_reconnect(coordinator, device):
+    """Changes made while offline reach the panel once it reconnects."""
+    await coordinator.async_refresh()
+    device.fail_connect = True
+    device.drop_connection()
+    device.writes.clear()
+
+    await coordinator.async_turn_on(brightness=40, rgb_color=(1, 2, 3))
+    assert not device.writes
+
+    device.fail_connect = False
+    await coordinator.async_refresh()
+    await coordinator.hass.async_block_till_done()
+
+    assert device.is_on is True
+    assert device.brightness == 40
+    assert device.rgb_color == (1, 2, 3)
+    # One packed write for all settings
+    assert len(device.writes) == 1
+
+
+# Ordering of control frames against chunked uploads
+
+
+async def test_control_frame_cuts_into_upload(coordinator, device, tmp_path):
+    """A control frame goes out between chunks and the upload still lands."""
+    path, data = _write_image(tmp_path, "a.bin", 5000)
+    await coordinator.async_refresh()
+    device.write_delay = 0.002
+
+    upload = asyncio.ensure_future(coordinator.async_display_image(path))
+    while len(device.writes) < 3:
+        await asyncio.sleep(0.001)
+    await coordinator.async_turn_on()
+    assert not upload.done()
+    await upload
+
+    assert device.commands.index(CMD_TURN_ON) < device.commands.index(
+        CMD_STORE_PROGRAM
+    )
+    assert _stored_image(device, device.selected_program) == data
+    assert device.discarded_bytes == 0
+
+
+async def test_batched_frames_keep_order(coordinator, device):
+    """Frames sent in a batch arrive in order in a single write."""
+    await coordinator.async_refresh()
+    device.writes.clear()
+
+    async with coordinator.async_batch():
+        await coordinator.async_turn_on(brightness=10)
+        await coordinator.async_turn_off()
+
+    assert len(device.writes) == 1
+    assert device.commands[-3:] == [CMD_TURN_ON, 0x09, CMD_TURN_OFF]
+    assert device.is_on is False
+
+
+async def test_cancelled_upload_is_aborted(coordinator, device):
+    """A transfer cancelled mid-frame does not swallow the next frame."""
+    await coordinator.async_refresh()
+    device.write_delay = 0.002
+    writes = len(device.writes)
+
+    frame = asyncio.ensure_future(
+        coordinator.async_send_frame(bytes(32 * 32 * 3), 32, 32, channel="stream")
+    )
+    while len(device.writes) < writes + 3:
+        await asyncio.sleep(0.001)
+    frame.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await frame
+
+    payload = coordinator._build_text_payload("after " * 30)
+    slot = await coordinator._async_store_program(payload)
+    assert device.programs[slot] == bytes(payload)